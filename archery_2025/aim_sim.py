@@ -0,0 +1,139 @@
+import math
+import random
+import time
+from typing import NamedTuple
+
+SIM_DT = 1 / 60  # 1ステップの長さ（以前の60FPSでの1フレームと同じ動きになる）
+MAX_STEPS_PER_FRAME = 10  # 処理が大きく遅れたときに追いつこうとして固まらないための上限
+
+
+class AimParams(NamedTuple):
+    """照準の揺れと縮小のパラメータ"""
+    center: tuple  # 揺れの中心（的の中心）
+    hard: bool = False
+    initial_sway_radius: float = 50
+    sway_speed: float = 2  # 1ステップで動く距離
+    shrink_rate: float = 3.5  # 1ステップで縮む半径
+    initial_min: float = 100
+    wind: float = 20  # ハードモードの風の強さ
+
+
+class AimState(NamedTuple):
+    """照準の位置（x, y）、揺れの目標地点（target_x, target_y）、照準の半径"""
+    x: float
+    y: float
+    target_x: float
+    target_y: float
+    radius: float
+
+
+def initial_state(params, radius=800):
+    cx, cy = params.center
+    return AimState(cx, cy, cx, cy, radius)
+
+
+def random_sway_target(params, sway_radius, rng):
+    """揺れの次の目標地点を的の中心から半径sway_radiusの円内に選ぶ"""
+    angle = rng.uniform(0, 2 * math.pi)
+    r = sway_radius * math.sqrt(rng.uniform(0, 1))
+    x = params.center[0] + r * math.cos(angle)
+    y = params.center[1] + r * math.sin(angle)
+    # ハードモードでは風の影響を追加
+    if params.hard:
+        x += rng.uniform(-params.wind, params.wind)
+        y += rng.uniform(-params.wind, params.wind)
+    return int(x), int(y)
+
+
+def step(state, params, ratio, rng=random):
+    """1ステップ分だけ照準を動かして縮め、新しい状態を返す
+
+    stateは変更しない。乱数はrngからだけ取るので、同じシードなら同じ結果になる。
+    """
+    x, y, target_x, target_y, radius = state
+
+    # 照準の揺れ（比率が高いほど大きく揺れる）
+    sway_radius = params.initial_sway_radius + 50 * ratio
+    sway_speed = params.sway_speed
+    # ハードモードでは揺れを強くする
+    if params.hard:
+        sway_radius += 30 * ratio
+        sway_speed += 1
+
+    if math.hypot(x - target_x, y - target_y) < 1:
+        target_x, target_y = random_sway_target(params, sway_radius, rng)
+    dx = target_x - x
+    dy = target_y - y
+    distance = math.hypot(dx, dy)
+    if distance > 0:
+        x += dx / distance * sway_speed
+        y += dy / distance * sway_speed
+
+    # 照準の縮小（比率が高いほど最小サイズが大きい）
+    min_radius = params.initial_min + 130 * ratio
+    if radius > min_radius:
+        radius = max(radius - params.shrink_rate, min_radius)
+    elif radius < min_radius:
+        radius = min_radius + params.shrink_rate
+
+    return AimState(x, y, target_x, target_y, radius)
+
+
+def simulate(params, ratios, state=None, rng=random):
+    """比率の列（1ステップに1つ）に沿って画面なしで照準を動かし、最後の状態を返す"""
+    if state is None:
+        state = initial_state(params)
+    for ratio in ratios:
+        state = step(state, params, ratio, rng)
+    return state
+
+
+class AimSimulation:
+    """照準を一定の時間刻みSIM_DTで進め、描画用にステップ間を補間する
+
+    advance()に実際に経過した時間を渡すと、溜まった時間の分だけstep()を呼ぶ。
+    フレームレートが60でも144でも、1秒あたりの動きは変わらない。
+    """
+    def __init__(self, params, state=None, dt=SIM_DT, rng=random):
+        self.params = params
+        self.dt = dt
+        self.rng = rng
+        self.reset(state or initial_state(params))
+
+    def reset(self, state):
+        self.state = state
+        self.previous = state
+        self.accumulator = 0.0
+
+    def advance(self, elapsed, ratio):
+        """elapsed秒だけ時間を進める。進めたステップ数を返す"""
+        self.accumulator += elapsed
+        steps = 0
+        while self.accumulator >= self.dt:
+            if steps == MAX_STEPS_PER_FRAME:
+                self.accumulator = 0.0  # 遅れた分は捨てる
+                break
+            self.previous = self.state
+            self.state = step(self.state, self.params, ratio, self.rng)
+            self.accumulator -= self.dt
+            steps += 1
+        return steps
+
+    def interpolated(self):
+        """描画用の (x, y, radius)。直前の2ステップを経過時間の割合で補間する"""
+        alpha = self.accumulator / self.dt
+        previous, state = self.previous, self.state
+        return (previous.x + (state.x - previous.x) * alpha,
+                previous.y + (state.y - previous.y) * alpha,
+                previous.radius + (state.radius - previous.radius) * alpha)
+
+
+if __name__ == '__main__':
+    # 画面なしでの実行速度を測る
+    params = AimParams(center=(960, 540), hard=True)
+    rng = random.Random(0)
+    num_steps = 200000
+    start = time.perf_counter()
+    state = simulate(params, (rng.uniform(0, 3) for _ in range(num_steps)), rng=rng)
+    elapsed = time.perf_counter() - start
+    print(f"{num_steps / elapsed:,.0f} steps/s  final state: {state}")
@@ -0,0 +1,586 @@
+import pygame
+import random
+import math
+from assets import AssetManager
+from text_cache import TextCache
+from dirty_rect import DirtyRectRenderer
+from score_client import ScoreSubmitter
+from aim_sim import AimParams, AimSimulation, initial_state
+from arrow_flight import ArrowFlight
+import audio
+
+# 弓矢の的あてゲーム本体。集中度（β波/α波の比率）の入力元はrun()に渡す
+# （main.pyは脳波計、without_OpenBCI.pyはキーボード・マウス）
+current_ratio = 0
+source = None
+
+# 色設定
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+BLUE = (0, 0, 255)
+RED = (255, 0, 0)
+
+# フォント設定（ここから照準の設定までの値はフルスクリーン用。ウィンドウで遊ぶときはrun()のsettingsで上書きする）
+FONT_SIZE = 70
+LARGE_FONT_SIZE = 110
+
+# canvas_imageのサイズ設定（画面幅と高さの比率で設定）
+CANVAS_WIDTH_RATIO = 0.6
+CANVAS_HEIGHT_RATIO = 0.4
+
+# 的の設定
+TARGET_WIDTH_RATIO = 0.5
+
+# 的のサイズ調整関数
+def get_target_size():
+    if game_mode == "Hard":
+        return int(WIDTH * TARGET_WIDTH_RATIO * 0.7)  # ハードモードでは的を小さく
+    else:
+        return int(WIDTH * TARGET_WIDTH_RATIO)
+
+# 矢のパラメータ（画面サイズに対する比率で指定）
+ARROW_WIDTH_RATIO = 0.5
+ARROW_HEIGHT_RATIO = 0.5
+ARROW_ANGLE = 45  # 矢の回転角度（度数法）
+
+# 矢の画像を調整する関数
+def adjust_arrow(width_ratio, height_ratio, angle):
+    global arrow_image_1, arrow_image_2, ARROW_WIDTH, ARROW_HEIGHT, arrow_flight
+    ARROW_WIDTH = int(WIDTH * width_ratio)
+    ARROW_HEIGHT = int(HEIGHT * height_ratio)
+    arrow_image_1 = assets.get("arrow_1.png", (ARROW_WIDTH, ARROW_HEIGHT), angle)
+    arrow_image_2 = assets.get("arrow_2.png", (ARROW_WIDTH, ARROW_HEIGHT), 48)
+    # 矢が飛ぶアニメーションの画面を、矢の画像が変わるたびに合成し直す
+    arrow_flight = ArrowFlight((WIDTH, HEIGHT), speed_images, [arrow_image_1, arrow_image_2],
+                               ANIMATION_DURATION, FADE_OUT_DURATION, SPEED_IMAGE_DURATION)
+
+# 的の更新
+def update_target_size():
+    global target_rect, target_radius
+    target_size = get_target_size()
+    target_rect = pygame.Rect(WIDTH // 2 - target_size // 2, HEIGHT // 2 - target_size // 2, target_size, target_size)
+    target_radius = target_size // 2
+
+# 得点範囲の更新
+def update_score_ranges():
+    global score_ranges
+    current_target_size = get_target_size()
+    current_radius = current_target_size // 2
+    score_ranges = {
+        10: 0.86 * current_radius / 5,
+        7: 1.9 * current_radius / 5,
+        5: 2.95 * current_radius / 5,
+        3: 3.96 * current_radius / 5,
+        1: current_radius
+    }
+
+# ゲーム状態
+initial_aim_radius = 800
+aim_radius = initial_aim_radius
+aim_shrink_rate = 3.5
+initial_min = 100
+score = 0
+hit_pos = None
+game_over = False
+animation_running = False
+animation_start_time = 0
+ANIMATION_DURATION = 2500  # 3秒間
+FADE_OUT_DURATION = 500  # フェードアウトの時間（ミリ秒）
+# 矢が的に届き、画面が白くフェードし始める時点（アニメーションの進み具合）。刺さる音はここで鳴らす
+HIT_PROGRESS = (ANIMATION_DURATION - FADE_OUT_DURATION) / ANIMATION_DURATION
+hit_sound_played = False
+SPEED_IMAGE_DURATION = 100  # 各速度画像の表示時間（ミリ秒）
+
+# 照準の揺れに関する変数（1/60秒あたりの値。動きはaim_sim.pyで一定の時間刻みで計算する）
+initial_sway_radius = 50
+sway_speed = 2
+
+
+
+# ゲーム状態の定数を追加
+START_SCREEN = 0
+NAME_INPUT = 1
+MODE_SELECT = 2
+PLAYING = 3
+RESULT_SCREEN = 4
+FINAL_RESULT_SCREEN = 5
+
+# グローバル変数を追加
+game_state = START_SCREEN
+game_count = 0
+total_score = 0
+scores = []
+game_start_time = 0  # ゲーム開始時刻
+AUTO_SHOOT_TIME = 20000  # 自動発射までの時間（ミリ秒）
+
+# カウントダウン関連の変数
+countdown_active = False
+countdown_start_time = 0
+COUNTDOWN_DURATION = 3000  # カウントダウンの時間（ミリ秒）
+COUNTDOWN_TOTAL = 3000  # カウントダウンの総時間（ミリ秒）
+
+# ゲームモード関連の変数
+game_mode = "Normal"
+selected_mode = 0  # 0: Normal, 1: Hard
+
+# 照準のシミュレーション（ゲーム開始時にモードに合わせて作り直す）
+def make_aim_params():
+    return AimParams(target_rect.center, hard=game_mode == "Hard",
+                     initial_sway_radius=initial_sway_radius, sway_speed=sway_speed,
+                     shrink_rate=aim_shrink_rate, initial_min=initial_min)
+
+# プレイヤー名関連の変数
+player_name = "名無し"
+name_input_active = False
+name_input_text = ""
+name_input_cursor = 0
+
+# 変化した領域だけを画面に転送する（Falseにすると毎フレーム全画面を描き直す）
+USE_DIRTY_RECTS = True
+
+FPS = 60  # 照準の動きは時間刻みで計算するので、120や144にしても難易度は変わらない
+frame_time = 0  # 前のフレームからの経過時間（秒）
+current_time = 0  # フレーム開始時の時刻（ミリ秒）
+
+# run()のsettingsで上書きできる、画面サイズに合わせて調整する値
+SIZE_SETTINGS = ("FONT_SIZE", "LARGE_FONT_SIZE", "CANVAS_WIDTH_RATIO", "CANVAS_HEIGHT_RATIO",
+                 "TARGET_WIDTH_RATIO", "initial_aim_radius", "aim_shrink_rate", "initial_min",
+                 "initial_sway_radius", "ANIMATION_DURATION")
+
+def apply_settings(settings):
+    """SIZE_SETTINGSの値を上書きし、それから計算する値を作り直す"""
+    global aim_radius, HIT_PROGRESS
+    unknown = set(settings) - set(SIZE_SETTINGS)
+    if unknown:
+        raise ValueError(f"上書きできない設定です: {', '.join(sorted(unknown))}")
+    globals().update(settings)
+    aim_radius = initial_aim_radius
+    HIT_PROGRESS = (ANIMATION_DURATION - FADE_OUT_DURATION) / ANIMATION_DURATION
+
+def setup(size=None, fullscreen=True, monitor="matplotlib", settings=None):
+    """画面を作り、画面サイズに合わせて画像・音声・フォントを読み込む
+
+    sizeを省略するとディスプレイの解像度を使う。monitorが"pygame"なら
+    ゲーム画面の左下に集中度の波形を表示する。settingsはSIZE_SETTINGSの値を上書きする辞書。
+    """
+    global WIDTH, HEIGHT, screen, eeg_monitor, assets, sounds, text_cache
+    global title_image, background_image, CANVAS_WIDTH, CANVAS_HEIGHT, canvas_image, result_image, canvas_rect
+    global target_width, target_image, speed_images, target_rect, target_radius
+    global aim_center_x, aim_center_y, aim_sim, score_submitter, renderer, clock
+
+    if settings:
+        apply_settings(settings)
+
+    # 初期設定
+    audio.pre_init()  # 効果音の遅れを減らすため、小さいバッファでミキサーを初期化させる
+    pygame.init()
+
+    pygame.display.set_caption("弓矢の的あてゲーム")
+    if size is None:
+        info = pygame.display.Info()
+        size = (info.current_w, info.current_h)
+    WIDTH, HEIGHT = size
+    screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.FULLSCREEN if fullscreen else 0)
+
+    # ゲーム画面内の脳波モニター（画面左下）
+    if monitor == "pygame":
+        from eeg_monitor import PygameMonitor
+        eeg_monitor = PygameMonitor((20, HEIGHT - 220, 400, 200))
+    else:
+        eeg_monitor = None
+
+    # 画像は一度だけ読み込み、拡大縮小した結果も使い回す
+    assets = AssetManager()
+
+    # 効果音はデコード済みの状態で読み込み、専用のチャネルで鳴らす。BGMはストリーミング再生
+    sounds = audio.AudioBank()
+    loaded = [sounds.load_effect("shoot", "arrow_shoot.mp3"),
+              sounds.load_effect("hit", "arrow_hit.mp3"),
+              sounds.play_bgm("background.mp3", volume=0.5)]  # BGMの音量を50%に設定
+    if not sounds.available:
+        print("音声を出力できません。音なしで実行します。")
+    elif not all(loaded):
+        print("音声ファイルが見つかりません。見つからない音声なしで実行します。")
+
+    text_cache = TextCache(["azukiLB.ttf"])  # 描画した文字列を使い回す
+
+    # 画像読み込み
+    title_image = assets.get("title.png", (WIDTH, HEIGHT))
+    background_image = assets.get("background.png", (WIDTH, HEIGHT))
+
+    CANVAS_WIDTH = int(WIDTH * CANVAS_WIDTH_RATIO)
+    CANVAS_HEIGHT = int(HEIGHT * CANVAS_HEIGHT_RATIO)
+    canvas_image = assets.get("canvas.png", (CANVAS_WIDTH, CANVAS_HEIGHT))
+    result_image = assets.get("result.png", (WIDTH, HEIGHT))
+
+    # canvas_imageの位置設定（画面中央）
+    canvas_rect = canvas_image.get_rect(center=(WIDTH // 2, HEIGHT))
+
+    # 的のサイズを画面の比率に基づいて設定
+    target_width = int(WIDTH * TARGET_WIDTH_RATIO)
+    target_image = assets.get("target.png", (target_width, target_width))
+
+    speed_images = [assets.get(f"speed_{i}.png", (WIDTH, HEIGHT)) for i in range(1, 4)]
+
+    # 初期の矢の調整
+    adjust_arrow(ARROW_WIDTH_RATIO, ARROW_HEIGHT_RATIO, ARROW_ANGLE)
+
+    # 的の設定
+    target_rect = target_image.get_rect(center=(WIDTH // 2, HEIGHT // 2))
+    target_radius = target_rect.width // 2
+    update_score_ranges()
+
+    aim_center_x, aim_center_y = target_rect.center
+    aim_sim = AimSimulation(make_aim_params(), initial_state(make_aim_params(), initial_aim_radius))
+
+    # スコアはバックグラウンドで送信する（サーバーに届かなければ保存して再送）
+    score_submitter = ScoreSubmitter('http://localhost:5000')
+
+    renderer = DirtyRectRenderer(screen, enabled=USE_DIRTY_RECTS)
+    clock = pygame.time.Clock()
+
+
+
+def calculate_score(hit_pos):
+    distance = math.hypot(hit_pos[0] - target_rect.centerx, hit_pos[1] - target_rect.centery)
+    for points, radius in score_ranges.items():
+        if distance <= radius:
+            return points
+    return 0
+
+def get_random_point_in_circle(center, radius):
+    angle = random.uniform(0, 2 * math.pi)
+    r = radius * math.sqrt(random.uniform(0, 1))
+    x = center[0] + r * math.cos(angle)
+    y = center[1] + r * math.sin(angle)
+    
+    # ハードモードでは風の影響を追加
+    if game_mode == "Hard":
+        wind_x = random.uniform(-20, 20)
+        wind_y = random.uniform(-20, 20)
+        x += wind_x
+        y += wind_y
+    
+    return (int(x), int(y))
+
+def draw_arrow_animation(progress):
+    # 事前に合成した画面を転送する（フレームごとにSurfaceを作らない）
+    arrow_flight.draw(screen, progress * ANIMATION_DURATION)
+
+def draw_start_screen():
+    screen.blit(title_image, (0, 0))
+
+def draw_countdown():
+    elapsed = current_time - countdown_start_time
+    
+    if elapsed >= COUNTDOWN_TOTAL:
+        global countdown_active
+        countdown_active = False
+        return
+    
+    # カウントダウンの表示
+    remaining = COUNTDOWN_TOTAL - elapsed
+    if remaining > 2000:
+        count_text = "3"
+    elif remaining > 1000:
+        count_text = "2"
+    else:
+        count_text = "1"
+    
+    count_surface = text_cache.render(count_text, LARGE_FONT_SIZE, BLACK)
+    count_rect = count_surface.get_rect(center=(WIDTH // 2, HEIGHT // 2))
+    return screen.blit(count_surface, count_rect)
+
+def render_fitted(text, size, color, margin=40):
+    """文字列を描画する。画面の幅に収まらなければ収まる大きさまで小さくする"""
+    surface = text_cache.render(text, size, color)
+    max_width = WIDTH - margin
+    if surface.get_width() > max_width:
+        surface = text_cache.render(text, max(1, size * max_width // surface.get_width()), color)
+    return surface
+
+def draw_name_input_screen():
+    screen.fill(WHITE)
+    title_text = text_cache.render("プレイヤー名を入力してください", FONT_SIZE, BLACK)
+    title_rect = title_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 100))
+    screen.blit(title_text, title_rect)
+    
+    # 名前入力欄の表示
+    name_text = text_cache.render(player_name, FONT_SIZE, BLUE)
+    name_rect = name_text.get_rect(center=(WIDTH // 2, HEIGHT // 2))
+    screen.blit(name_text, name_rect)
+    
+    instruction_text = text_cache.render("Enterキーを押して決定", FONT_SIZE, BLACK)
+    instruction_rect = instruction_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 100))
+    screen.blit(instruction_text, instruction_rect)
+
+def draw_mode_select_screen():
+    screen.fill(WHITE)
+    title_text = text_cache.render("モード選択", LARGE_FONT_SIZE, BLACK)
+    title_rect = title_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 150))
+    screen.blit(title_text, title_rect)
+    
+    # モード選択の表示
+    modes = ["Normal", "Hard"]
+    for i, mode in enumerate(modes):
+        color = RED if i == selected_mode else BLACK
+        mode_text = text_cache.render(mode, FONT_SIZE, color)
+        mode_rect = mode_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 50 + i * 80))
+        screen.blit(mode_text, mode_rect)
+    
+    instruction_text = render_fitted("上下キーで選択、スペースキーで決定", FONT_SIZE, BLACK)
+    instruction_rect = instruction_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 150))
+    screen.blit(instruction_text, instruction_rect)
+
+
+
+def draw_result_screen():
+    screen.blit(result_image, (0, 0))
+    score_text = text_cache.render(f'得点: {score}点', FONT_SIZE, BLACK)
+    screen.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, HEIGHT // 2))
+    instruction_text = text_cache.render('スペースキーを押して再開', FONT_SIZE, BLACK)
+    screen.blit(instruction_text, (WIDTH // 2 - instruction_text.get_width() // 2, HEIGHT // 2 + 50))
+
+# メインループ内で使用する関数を追加
+def reset_game():
+    global aim_radius, score, game_over, animation_running, game_start_time, countdown_active, countdown_start_time, aim_sim
+    aim_radius = initial_aim_radius
+    # 照準の位置は前のゲームから引き継ぎ、半径だけ戻す
+    aim_sim = AimSimulation(make_aim_params(), aim_sim.state._replace(radius=initial_aim_radius))
+    score = 0
+    game_over = False
+    animation_running = False
+    countdown_active = True
+    countdown_start_time = current_time  # カウントダウン開始時刻を記録
+    game_start_time = countdown_start_time + COUNTDOWN_TOTAL  # ゲーム開始時刻をカウントダウン後に設定
+    
+    # 得点範囲の更新
+    update_score_ranges()
+
+def draw_final_result_screen():
+    screen.blit(result_image, (0, 0))
+    total_score_text = text_cache.render(f'合計得点: {total_score}点', LARGE_FONT_SIZE, BLACK)
+    screen.blit(total_score_text, (WIDTH // 2 - total_score_text.get_width() // 2, HEIGHT // 2 - 230))
+    for i, score in enumerate(scores):
+        score_text = text_cache.render(f'{i+1}回目: {score}点', LARGE_FONT_SIZE, BLACK)
+        screen.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, HEIGHT // 2 - 120 + i*90))
+    instruction_text = render_fitted('Rキーでランキングに送信、スペースキーでスタート画面に戻る', FONT_SIZE, BLACK)
+    screen.blit(instruction_text, (WIDTH // 2 - instruction_text.get_width() // 2, HEIGHT - 100))
+
+def submit_score_to_server():
+    data = {
+        'player_name': player_name,
+        'total_score': total_score,
+        'game_mode': game_mode,
+        'scores': list(scores)
+    }
+    print(f"送信データ: {data}")
+    score_submitter.submit(data)
+
+
+
+def get_scene_key():
+    """静的な部分の見た目を決める状態。これが変わったら静的な部分を描き直す"""
+    if game_state == NAME_INPUT:
+        return (game_state, player_name)
+    if game_state == MODE_SELECT:
+        return (game_state, selected_mode)
+    if game_state == PLAYING:
+        return (game_state, game_count, countdown_active, animation_running, game_over)
+    return (game_state,)
+
+def draw_playing_static():
+    """ゲームプレイ中の、フレームごとに変化しない部分を描画する"""
+    global target_rect
+    screen.blit(background_image, (0, 0))
+    # カウントダウン中でない場合のみcanvas_imageを表示
+    if countdown_active:
+        return
+    screen.blit(canvas_image, canvas_rect.topleft)
+    if animation_running:
+        return
+
+    # 的の描画
+    target_size = get_target_size()
+    scaled_target = assets.get("target.png", (target_size, target_size))
+    target_rect = scaled_target.get_rect(center=(WIDTH // 2, HEIGHT // 2))
+    screen.blit(scaled_target, target_rect)
+
+    # 当たった点の描画
+    if hit_pos and game_over:
+        pygame.draw.circle(screen, BLUE, hit_pos, 10)
+        # スコアをヒット位置の上に表示する関数
+        score_text = text_cache.render(f'得点: {score}点', FONT_SIZE, BLUE)
+        score_rect = score_text.get_rect(center=(WIDTH // 2, 30))
+        screen.blit(score_text, score_rect)
+    else:
+        # スコアの表示
+        score_text = text_cache.render('集中して的を狙おう！', FONT_SIZE, BLUE)
+        score_text_rect = score_text.get_rect(center=(WIDTH // 2, 30))  # 画面の中央上側に位置
+        screen.blit(score_text, score_text_rect)
+
+    if game_over:
+        instruction_text = text_cache.render('スペースキーを押して再開', FONT_SIZE, BLACK)
+        screen.blit(instruction_text, (WIDTH // 2 - instruction_text.get_width() // 2, HEIGHT - 50))
+
+def draw_static_scene():
+    """現在の場面の静的な部分を描画する"""
+    screen.fill(WHITE)
+    if game_state == START_SCREEN:
+        draw_start_screen()
+    elif game_state == NAME_INPUT:
+        draw_name_input_screen()
+    elif game_state == MODE_SELECT:
+        draw_mode_select_screen()
+    elif game_state == PLAYING:
+        draw_playing_static()
+    elif game_state == RESULT_SCREEN:
+        draw_result_screen()
+    elif game_state == FINAL_RESULT_SCREEN:
+        draw_final_result_screen()
+
+def shoot():
+    """照準の円の中に矢を放ち、矢のアニメーションと効果音を始める"""
+    global hit_pos, score, animation_running, animation_start_time, hit_sound_played
+    hit_pos = get_random_point_in_circle((aim_center_x, aim_center_y), aim_radius)
+    score = calculate_score(hit_pos)
+    animation_running = True
+    animation_start_time = current_time
+    hit_sound_played = False
+    # 矢を打った時の効果音を、アニメーションの最初のフレームと同時に再生
+    sounds.play("shoot")
+
+def handle_event(event):
+    """イベントを1つ処理する。ウィンドウが閉じられたらFalseを返す"""
+    global game_state, player_name, game_mode, selected_mode, game_count, total_score, scores
+    if event.type == pygame.QUIT:
+        return False
+    elif event.type == pygame.TEXTINPUT:
+        if game_state == NAME_INPUT:
+            player_name += event.text
+    elif event.type == pygame.KEYDOWN:
+        if event.key == pygame.K_SPACE:
+            if game_state == START_SCREEN:
+                game_state = NAME_INPUT
+                pygame.key.start_text_input()
+            elif game_state == MODE_SELECT:
+                pygame.key.stop_text_input()
+                game_mode = "Normal" if selected_mode == 0 else "Hard"
+                game_state = PLAYING
+                reset_game()
+            elif game_state == PLAYING and not game_over and not animation_running and not countdown_active:
+                shoot()
+            elif game_state == PLAYING and game_over:
+                game_count += 1
+                scores.append(score)
+                total_score += score
+                if game_count < 3:
+                    game_state = PLAYING
+                    reset_game()
+                else:
+                    game_state = FINAL_RESULT_SCREEN
+            elif game_state == FINAL_RESULT_SCREEN:
+                # スタート画面に戻る
+                game_state = START_SCREEN
+                game_count = 0
+                total_score = 0
+                scores = []
+        elif event.key == pygame.K_RETURN:
+            if game_state == NAME_INPUT:
+                pygame.key.stop_text_input()
+                game_state = MODE_SELECT
+        elif event.key == pygame.K_BACKSPACE:
+            if game_state == NAME_INPUT and len(player_name) > 0:
+                player_name = player_name[:-1]
+        elif event.key == pygame.K_UP:
+            if game_state == MODE_SELECT:
+                selected_mode = (selected_mode - 1) % 2
+        elif event.key == pygame.K_DOWN:
+            if game_state == MODE_SELECT:
+                selected_mode = (selected_mode + 1) % 2
+        elif event.key == pygame.K_r:
+            if game_state == FINAL_RESULT_SCREEN:
+                submit_score_to_server()
+    return True
+
+def update_frame():
+    """1フレーム分のゲームの更新と描画を行う"""
+    global remaining_time, game_over, animation_running, hit_sound_played
+    global aim_center_x, aim_center_y, aim_radius
+    if game_state == PLAYING:
+        # remaining_timeを常に計算
+        if not game_over and not animation_running:
+            elapsed_time = current_time - game_start_time
+            remaining_time = max(0, AUTO_SHOOT_TIME - elapsed_time)
+
+        # 10秒経過したら自動発射（このフレームから全画面のアニメーションにするので、描画を始める前に決める）
+        if not countdown_active and not game_over and not animation_running and remaining_time <= 0:
+            shoot()
+
+    # 場面が変わったときだけ静的な部分を描き直す（アニメーション中は全画面を転送）
+    renderer.begin(get_scene_key(), draw_static_scene,
+                   full_screen=game_state == PLAYING and animation_running)
+
+    if game_state == PLAYING:
+        # カウントダウンの処理
+        if countdown_active:
+            renderer.mark(draw_countdown())
+
+        if animation_running:
+            animation_progress = (current_time - animation_start_time) / ANIMATION_DURATION
+            # 矢が的に届いたフレームで刺さった時の効果音を再生
+            if animation_progress >= HIT_PROGRESS and not hit_sound_played:
+                sounds.play("hit")
+                hit_sound_played = True
+            if animation_progress >= 1:
+                animation_running = False
+                game_over = True
+            else:
+                draw_arrow_animation(animation_progress)
+        else:
+            # カウントダウン中でない場合のみ照準とタイマーを表示
+            if not countdown_active and not game_over:
+                # 照準の位置更新（一定の時間刻みで進める）と描画（ステップ間を補間）
+                aim_sim.advance(frame_time, current_ratio)
+                aim_center_x, aim_center_y, aim_radius = aim_sim.interpolated()
+                if aim_radius > 0:
+                    renderer.mark(pygame.draw.circle(screen, BLACK, (int(aim_center_x), int(aim_center_y)), int(aim_radius), 5))
+                    print(current_ratio)
+
+                # タイマーの表示
+                timer_text = text_cache.render(f'残り時間: {remaining_time // 1000}.{(remaining_time % 1000) // 100}秒', FONT_SIZE, RED)
+                timer_rect = timer_text.get_rect(center=(WIDTH // 2, 80))
+                renderer.blit(timer_text, timer_rect)
+
+    if eeg_monitor:
+        renderer.mark(eeg_monitor.draw(screen))
+    renderer.end()
+
+def shutdown():
+    """測定とスコア送信を止めてゲームを終了する"""
+    source.stop()
+    score_submitter.close()
+    pygame.quit()
+    exit()
+
+def run(concentration_source, size=None, fullscreen=True, monitor="matplotlib", settings=None):
+    """測定を開始してから画面を作り、ゲームを開始する（終了するまで戻らない）"""
+    global source, current_time, current_ratio, frame_time
+    source = concentration_source
+    source.start()
+    setup(size, fullscreen, monitor, settings)
+    while True:
+        current_time = pygame.time.get_ticks()
+
+        # 入力元から最新の比率を読み出す（測定プロセスの場合はロックなしで読む）
+        current_ratio = source.read()
+        if eeg_monitor:
+            eeg_monitor.push(current_ratio)
+
+        for event in pygame.event.get():
+            if not handle_event(event):
+                shutdown()
+            source.handle_event(event)
+
+        update_frame()
+        frame_time = clock.tick(FPS) / 1000
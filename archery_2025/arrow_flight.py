@@ -0,0 +1,47 @@
+import pygame
+
+WHITE = (255, 255, 255)
+
+
+class ArrowFlight:
+    """矢が飛ぶアニメーションの画面を事前に合成しておき、再生時は転送するだけにする
+
+    飛んでいる間の画面は（速度画像, 矢の画像）の組み合わせでしか変わらないので、
+    組み合わせごとに一度だけ画面サイズ・画面と同じピクセル形式のSurfaceに合成する。
+    フェードアウトは最後の画面を白で塗った画面に透明度を変えて重ねる。
+    再生中に新しいSurfaceは確保しない。画面サイズや画像が変わったら作り直すこと。
+    """
+    def __init__(self, size, speed_images, arrow_images, duration=2500, fade_duration=500, speed_image_duration=100):
+        self.duration = duration
+        self.fade_duration = fade_duration
+        self.speed_image_duration = speed_image_duration
+        # frames[速度画像の番号][矢の画像の番号]
+        self.frames = [[self._compose(size, speed_image, arrow_image) for arrow_image in arrow_images]
+                       for speed_image in speed_images]
+        # フェードアウト用（透明度を変えるので飛んでいる間の画面とは別に持つ）
+        self.fade_frame = self.frames[-1][-1].copy()
+
+    @staticmethod
+    def _compose(size, speed_image, arrow_image):
+        frame = pygame.Surface(size).convert()
+        frame.blit(speed_image, (0, 0))
+        # 矢を中央に配置
+        arrow_x = size[0] // 2 - arrow_image.get_width() // 2
+        arrow_y = size[1] // 2 - arrow_image.get_height() // 2
+        frame.blit(arrow_image, (arrow_x, arrow_y))
+        return frame
+
+    def draw(self, surface, elapsed):
+        """矢を放ってからelapsedミリ秒後の画面を描画する"""
+        fade_start = self.duration - self.fade_duration
+        if elapsed < fade_start:
+            # 速度画像のローテーションと、途中で矢の画像を切り替える
+            speed_frames = self.frames[int(elapsed / self.speed_image_duration) % len(self.frames)]
+            arrow_index = min(int(elapsed / self.duration * len(speed_frames)), len(speed_frames) - 1)
+            surface.blit(speed_frames[arrow_index], (0, 0))
+        else:
+            # 画面を徐々に白くする
+            fade_progress = min((elapsed - fade_start) / self.fade_duration, 1)
+            surface.fill(WHITE)
+            self.fade_frame.set_alpha(int(255 * (1 - fade_progress)))
+            surface.blit(self.fade_frame, (0, 0))
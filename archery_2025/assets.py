@@ -0,0 +1,55 @@
+import os
+from collections import OrderedDict
+import pygame
+
+
+class AssetManager:
+    """画像を一度だけ読み込み、拡大縮小・回転した画像をキャッシュする
+
+    読み込んだ画像は画面と同じピクセル形式に変換しておく（透過PNGはconvert_alpha）。
+    拡大縮小・回転した画像は (ファイル名, サイズ, 角度) ごとに保持し、
+    max_variants個を超えたら最も長く使われていないものから破棄する。
+    pygame.display.set_mode()の後に使うこと。
+    """
+    def __init__(self, base_dir="", max_variants=64):
+        self.base_dir = base_dir
+        self.max_variants = max_variants
+        self._images = {}
+        self._variants = OrderedDict()
+
+    def load(self, name):
+        """元の大きさの画像を返す（ディスクから読むのは最初の1回だけ）"""
+        image = self._images.get(name)
+        if image is None:
+            image = pygame.image.load(os.path.join(self.base_dir, name))
+            if image.get_flags() & pygame.SRCALPHA:
+                image = image.convert_alpha()
+            else:
+                image = image.convert()
+            self._images[name] = image
+        return image
+
+    def get(self, name, size=None, angle=0):
+        """sizeに拡大縮小し、angle度回転した画像を返す"""
+        if size is None and angle == 0:
+            return self.load(name)
+        key = (name, tuple(size) if size else None, angle)
+        image = self._variants.get(key)
+        if image is not None:
+            self._variants.move_to_end(key)
+            return image
+
+        image = self.load(name)
+        if size:
+            image = pygame.transform.scale(image, size)
+        if angle:
+            image = pygame.transform.rotate(image, angle)
+        self._variants[key] = image
+        if len(self._variants) > self.max_variants:
+            self._variants.popitem(last=False)
+        return image
+
+    def clear(self):
+        """画面サイズの変更時などにキャッシュを破棄する"""
+        self._images.clear()
+        self._variants.clear()
@@ -0,0 +1,92 @@
+import os
+import wave
+import pygame
+
+# ミキサーの設定。バッファを小さくして、再生を指示してから音が出るまでの遅れを減らす
+# （512サンプル ≒ 44100Hzで約12ミリ秒。音が途切れる環境では1024に増やす）
+AUDIO_FREQUENCY = 44100
+AUDIO_BUFFER = 512
+
+
+def pre_init():
+    """pygame.init()の前に呼び、ミキサーを低遅延の設定で初期化させる"""
+    pygame.mixer.pre_init(AUDIO_FREQUENCY, -16, 2, AUDIO_BUFFER)
+
+
+class AudioBank:
+    """効果音をデコード済みの状態で保持し、効果音ごとに専用のチャネルで鳴らす
+
+    mp3などの効果音は最初の起動時にデコードして、ミキサーと同じ形式のWAVとして
+    cache_dirに保存する。次回からはWAVを読むだけなのでデコードしない。
+    効果音のチャネルは予約しておくので、他の音に取られて鳴らないことはない。
+    BGMはpygame.mixer.musicでストリーミング再生し、効果音のチャネルは使わない。
+    ミキサーが初期化できなかった（音声デバイスがないなど）ときは何も読み込まず、音なしで動く。
+    """
+    def __init__(self, cache_dir="audio_cache"):
+        self.cache_dir = cache_dir
+        self.sounds = {}
+        self.channels = {}
+
+    @property
+    def available(self):
+        """ミキサーが使えるか（pygame.mixer.get_init()は初期化できなかったときNoneを返す）"""
+        return pygame.mixer.get_init() is not None
+
+    def _cache_path(self, path):
+        frequency, size, channels = pygame.mixer.get_init()
+        name = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(self.cache_dir, f"{name}_{frequency}_{abs(size)}_{channels}.wav")
+
+    def _decode(self, path):
+        """効果音を読み込む。キャッシュのWAVが元のファイルより新しければそちらを使う"""
+        cache_path = self._cache_path(path)
+        if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+            return pygame.mixer.Sound(cache_path)
+
+        sound = pygame.mixer.Sound(path)
+        frequency, size, channels = pygame.mixer.get_init()
+        if abs(size) == 16:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = cache_path + ".tmp"
+            with wave.open(tmp_path, "wb") as f:
+                f.setnchannels(channels)
+                f.setsampwidth(2)
+                f.setframerate(frequency)
+                f.writeframes(sound.get_raw())
+            os.replace(tmp_path, cache_path)
+        return sound
+
+    def load_effect(self, name, path, volume=1.0):
+        """効果音を読み込み、専用のチャネルを割り当てる。ファイルがないか音を出せなければFalseを返す"""
+        if not self.available:
+            return False
+        try:
+            sound = self._decode(path)
+        except (pygame.error, FileNotFoundError):
+            return False
+        sound.set_volume(volume)
+        self.sounds[name] = sound
+        if name not in self.channels:
+            index = len(self.channels)
+            pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), index + 1))
+            pygame.mixer.set_reserved(index + 1)
+            self.channels[name] = pygame.mixer.Channel(index)
+        return True
+
+    def play(self, name):
+        """効果音を鳴らす（読み込めなかった効果音は何もしない）"""
+        sound = self.sounds.get(name)
+        if sound:
+            self.channels[name].play(sound)
+
+    def play_bgm(self, path, volume=0.5):
+        """BGMをループ再生する。ファイルがないか音を出せなければFalseを返す"""
+        if not self.available:
+            return False
+        try:
+            pygame.mixer.music.load(path)
+        except (pygame.error, FileNotFoundError):
+            return False
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(-1)  # -1でループ再生
+        return True
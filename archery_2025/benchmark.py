@@ -0,0 +1,207 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+from aim_sim import SIM_DT
+
+_Surface = pygame.Surface
+FRAME_MS = SIM_DT * 1000  # 仮想時間で1フレーム = 1/60秒として進める
+
+# 数える描画・Surface生成の呼び出し（名前は関数・メソッド名）
+BLIT_CALLS = {'blit', 'blits'}
+SURFACE_CALLS = {'copy', 'convert', 'convert_alpha', 'subsurface', 'scale', 'smoothscale',
+                 'rotate', 'rotozoom', 'render'}
+
+
+def key(key):
+    return pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode='')
+
+
+def text(value):
+    return pygame.event.Event(pygame.TEXTINPUT, text=value)
+
+
+def make_script(game_mode='Hard', aim_seconds=5.0):
+    """スタート画面から3回プレイして最終結果画面、スタート画面に戻るまでの入力
+
+    (待つフレーム数, イベント) のリスト。待つ時間はカウントダウン・アニメーションの長さに合わせてある。
+    """
+    frames = lambda seconds: int(seconds * 1000 / FRAME_MS)
+    script = [(30, key(pygame.K_SPACE))]  # スタート画面 → 名前入力
+    script += [(5, text(c)) for c in 'bench']
+    script += [(10, key(pygame.K_RETURN))]  # → モード選択
+    if game_mode == 'Hard':
+        script += [(30, key(pygame.K_DOWN))]
+    script += [(30, key(pygame.K_SPACE))]  # → プレイ
+    for _ in range(3):
+        script += [(frames(3 + aim_seconds), key(pygame.K_SPACE)),  # カウントダウン後に狙って射る
+                   (frames(2.5 + 1), key(pygame.K_SPACE))]  # 矢のアニメーション後に次へ
+    script += [(frames(2), key(pygame.K_SPACE)),  # 最終結果画面 → スタート画面
+               (30, None)]
+    return script
+
+
+class CallCounter:
+    """sys.setprofileで、C関数（pygameの描画など）の呼び出し回数を数える"""
+    def __init__(self):
+        self.blits = 0
+        self.surfaces = 0
+
+    def __call__(self, frame, event, arg):
+        if event == 'c_call':
+            name = arg.__name__
+            if name in BLIT_CALLS:
+                self.blits += 1
+            elif name in SURFACE_CALLS:
+                self.surfaces += 1
+
+
+def run(game, script, ratios, profile=False):
+    """scriptどおりにゲームを進め、フレームごとの (状態, 秒, blit回数, Surface生成数, 一時メモリ) を返す"""
+    samples = []
+    surface_count = [0]
+
+    class CountingSurface(_Surface):
+        def __init__(self, *args, **kwargs):
+            surface_count[0] += 1
+            super().__init__(*args, **kwargs)
+
+    counter = CallCounter()
+    if profile:
+        pygame.Surface = CountingSurface  # pygame.Surface(...) での生成も数える
+        tracemalloc.start()
+    frame = 0
+    try:
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            for wait, event in script:
+                for i in range(wait):
+                    # 各フレームの出力は測定に含めるが、画面には出さない
+                    output.seek(0)
+                    output.truncate()
+                    game.current_time = int(frame * FRAME_MS)
+                    game.frame_time = SIM_DT
+                    game.current_ratio = ratios[frame % len(ratios)]
+                    events = [event] if event is not None and i == wait - 1 else []
+                    state = game.game_state
+
+                    counter.blits = counter.surfaces = surface_count[0] = 0
+                    if profile:
+                        tracemalloc.reset_peak()
+                        before = tracemalloc.get_traced_memory()[0]
+                        sys.setprofile(counter)
+                    start = time.perf_counter()
+                    if game.eeg_monitor:
+                        game.eeg_monitor.push(game.current_ratio)
+                    for e in events:
+                        game.handle_event(e)
+                    game.update_frame()
+                    elapsed = time.perf_counter() - start
+                    if profile:
+                        sys.setprofile(None)
+                        allocated = tracemalloc.get_traced_memory()[1] - before
+                    else:
+                        allocated = 0
+                    samples.append((state, elapsed, counter.blits, counter.surfaces + surface_count[0], allocated))
+                    frame += 1
+    finally:
+        sys.setprofile(None)
+        pygame.Surface = _Surface
+        if profile:
+            tracemalloc.stop()
+    return samples
+
+
+def summarize(game, timing, counts):
+    """状態ごとに処理時間のパーセンタイルと1フレームあたりの平均回数をまとめる"""
+    names = {game.START_SCREEN: 'START_SCREEN', game.NAME_INPUT: 'NAME_INPUT', game.MODE_SELECT: 'MODE_SELECT',
+             game.PLAYING: 'PLAYING', game.RESULT_SCREEN: 'RESULT_SCREEN',
+             game.FINAL_RESULT_SCREEN: 'FINAL_RESULT_SCREEN'}
+    report = {}
+    for state, name in names.items():
+        times = np.array([t for s, t, *_ in timing if s == state]) * 1000
+        if len(times) == 0:
+            continue
+        frames = [c for c in counts if c[0] == state]
+        report[name] = {
+            'frames': len(times),
+            'p50_ms': float(np.percentile(times, 50)),
+            'p95_ms': float(np.percentile(times, 95)),
+            'p99_ms': float(np.percentile(times, 99)),
+            'max_ms': float(times.max()),
+            'blits_per_frame': float(np.mean([c[2] for c in frames])),
+            'surfaces_per_frame': float(np.mean([c[3] for c in frames])),
+            'alloc_kb_per_frame': float(np.mean([c[4] for c in frames]) / 1024),
+        }
+    return report
+
+
+def print_report(report):
+    print(f"{'state':20s} {'frames':>6s} {'p50':>7s} {'p95':>7s} {'p99':>7s} {'max':>7s}  "
+          f"{'blits':>6s} {'surf':>6s} {'allocKB':>8s}")
+    for name, r in report.items():
+        print(f"{name:20s} {r['frames']:6d} {r['p50_ms']:7.2f} {r['p95_ms']:7.2f} {r['p99_ms']:7.2f} "
+              f"{r['max_ms']:7.2f}  {r['blits_per_frame']:6.1f} {r['surfaces_per_frame']:6.1f} "
+              f"{r['alloc_kb_per_frame']:8.1f}")
+    print("(時間はミリ秒、blits/surf/allocKBは1フレームあたりの平均)")
+
+
+def compare(report, baseline, tolerance):
+    """保存しておいた結果と比べ、p95の処理時間がtolerance倍を超えた状態の名前を返す"""
+    regressions = []
+    for name, r in report.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        ratio = r['p95_ms'] / max(base['p95_ms'], 1e-3)
+        mark = '  <-- 遅くなっています' if ratio > tolerance else ''
+        print(f"{name:20s} p95 {base['p95_ms']:7.2f} -> {r['p95_ms']:7.2f} ms (x{ratio:.2f})  "
+              f"blits {base['blits_per_frame']:.1f} -> {r['blits_per_frame']:.1f}{mark}")
+        if ratio > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='ゲームの描画ループのベンチマーク（画面なし）')
+    parser.add_argument('--mode', choices=['Normal', 'Hard'], default='Hard')
+    parser.add_argument('--aim-seconds', type=float, default=5.0, help='1回のプレイで狙う秒数')
+    parser.add_argument('--full-redraw', action='store_true', help='毎フレーム全画面を描き直す')
+    parser.add_argument('--output', default=None, help='結果を保存するJSONファイル')
+    parser.add_argument('--baseline', default=None, help='比較する以前の結果（--outputで保存したもの）')
+    parser.add_argument('--tolerance', type=float, default=1.25, help='p95がこの倍率を超えたら失敗とする')
+    args = parser.parse_args()
+
+    import archery_game as game
+    with contextlib.redirect_stdout(io.StringIO()):
+        game.setup()  # ウィンドウはdummyドライバーで作られる。脳波の測定は開始しない
+    game.renderer.enabled = not args.full_redraw
+    print(f"screen: {game.WIDTH}x{game.HEIGHT}  dirty rects: {game.renderer.enabled}")
+
+    script = make_script(args.mode, args.aim_seconds)
+    ratios = np.abs(np.sin(np.arange(3600) * SIM_DT * 0.5)) * 2  # ゆっくり変化する比率
+    # 1回目は処理時間だけを測り、2回目に呼び出し回数とメモリ確保を数える（数える処理は重いため）
+    timing = run(game, script, ratios)
+    counts = run(game, script, ratios, profile=True)
+    report = summarize(game, timing, counts)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'screen': [game.WIDTH, game.HEIGHT], 'dirty_rects': game.renderer.enabled,
+                       'states': report}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['states']
+        if compare(report, baseline, args.tolerance):
+            sys.exit(1)
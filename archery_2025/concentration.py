@@ -0,0 +1,106 @@
+import threading
+import time
+import pygame
+
+
+class ConcentrationSource:
+    """ゲームに集中度（β波/α波の比率）を渡す入力元
+
+    ゲームは画面を作る前にstart()を、毎フレームread()とhandle_event()を、
+    終了時にstop()を呼ぶ。
+    """
+    def start(self):
+        pass
+
+    def read(self):
+        """最新の比率を返す"""
+        return 0.0
+
+    def handle_event(self, event):
+        """pygameのイベントを受け取る（キーボード・マウスで操作する入力元用）"""
+        pass
+
+    def stop(self):
+        pass
+
+
+class BoardSource(ConcentrationSource):
+    """脳波のボードから比率を計算する入力元
+
+    board: "ganglion"（OpenBCI）、"synthetic"（BrainFlowの疑似ボード）、"replay"（recordingの記録ファイル）
+    use_process=Trueなら別プロセスで測定して共有メモリで受け取り、Falseならスレッドで測定する。
+    brainflowとmatplotlibはstart()で必要になったときに読み込む。
+    """
+    def __init__(self, board="ganglion", recording=None, show_plot=True, use_process=True, warmup=5):
+        self.board = board
+        self.recording = recording
+        self.show_plot = show_plot
+        self.use_process = use_process
+        self.warmup = warmup  # ボードの準備を待つ秒数
+        self.process = None
+        self.channel = None
+        self.thread = None
+        self.ratio = 0.0
+        self._stop = False
+
+    def start(self):
+        if self.use_process:
+            from eeg_process import start_acquisition_process
+            self.process, self.channel = start_acquisition_process(
+                show_plot=self.show_plot, source=self.board, recording=self.recording)
+        else:
+            from eeg_measure import measure
+            from eeg_replay import create_board
+            self.thread = threading.Thread(target=measure.calcurate, args=(self._update,),
+                                           kwargs={'should_stop': lambda: self._stop,
+                                                   'show_plot': self.show_plot,
+                                                   'board': create_board(self.board, recording=self.recording)},
+                                           daemon=True)
+            self.thread.start()
+        time.sleep(self.warmup)
+
+    def _update(self, timestamp, alpha_energy, beta_energy, ratio):
+        self.ratio = ratio
+
+    def read(self):
+        if self.channel:
+            return self.channel.read()[3]
+        return self.ratio
+
+    def stop(self):
+        if self.process:
+            from eeg_process import stop_acquisition_process
+            stop_acquisition_process(self.process, self.channel)
+        self._stop = True
+
+
+class ManualSource(ConcentrationSource):
+    """キーボード・マウスで比率を操作する入力元（脳波計なしで遊ぶとき用）
+
+    マウスホイールかPageUp/PageDownキーでstepずつ増減する。
+    """
+    def __init__(self, ratio=1.0, step=0.25, maximum=5.0):
+        self.ratio = ratio
+        self.step = step
+        self.maximum = maximum
+
+    def read(self):
+        return self.ratio
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEWHEEL:
+            delta = event.y
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_PAGEUP:
+            delta = 1
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_PAGEDOWN:
+            delta = -1
+        else:
+            return
+        self.ratio = min(max(self.ratio + delta * self.step, 0.0), self.maximum)
+
+
+def create_source(name, recording=None, show_plot=True, use_process=True):
+    """名前から入力元を作る。"keyboard"ならManualSource、それ以外はBoardSourceのboard"""
+    if name == "keyboard":
+        return ManualSource()
+    return BoardSource(name, recording=recording, show_plot=show_plot, use_process=use_process)
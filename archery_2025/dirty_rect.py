@@ -0,0 +1,63 @@
+import pygame
+
+
+class DirtyRectRenderer:
+    """場面ごとに変化しない部分と動く部分を分け、変化した領域だけを画面に転送する
+
+    場面（scene_key）が変わったときだけ静的な部分を描き直して全画面を転送する。
+    それ以外のフレームでは、前フレームで動く部分を描いた領域を保存しておいた
+    静的な画像で消し、今フレームの動く部分の領域と合わせて
+    pygame.display.update(rects) に渡す。enabled=Falseなら毎フレーム全画面を描き直す。
+    """
+    def __init__(self, screen, enabled=True):
+        self.screen = screen
+        self.enabled = enabled
+        self.background = pygame.Surface(screen.get_size()).convert()
+        self.scene_key = None
+        self.full_redraw = True
+        self._previous = []  # 前フレームで動く部分を描いた領域
+        self._current = []
+
+    def begin(self, scene_key, draw_static, full_screen=False):
+        """フレームの開始。場面が変わったらdraw_static()で静的な部分を描き直す
+
+        full_screen=Trueは全画面が動くフレーム（アニメーションなど）で、
+        静的な画像で全体を描き直してから全画面を転送する。
+        """
+        if not self.enabled or scene_key != self.scene_key:
+            self.scene_key = scene_key
+            draw_static()
+            self.background.blit(self.screen, (0, 0))
+            self.full_redraw = True
+        elif full_screen or self.full_redraw:
+            self.screen.blit(self.background, (0, 0))
+            self.full_redraw = True
+        else:
+            # 前フレームの動く部分を静的な画像で消す
+            for rect in self._previous:
+                self.screen.blit(self.background, rect, rect)
+        self._current = []
+
+    def mark(self, rect):
+        """動く部分を描いた領域を登録する"""
+        if rect:
+            self._current.append(pygame.Rect(rect).clip(self.screen.get_rect()))
+
+    def blit(self, surface, dest):
+        """screenに描画して、その領域を登録する"""
+        rect = self.screen.blit(surface, dest)
+        self.mark(rect)
+        return rect
+
+    def invalidate(self):
+        """次のフレームで静的な部分を描き直させる（画面サイズの変更など）"""
+        self.scene_key = None
+
+    def end(self):
+        """変化した領域（全画面を描き直したフレームは全体）を画面に転送する"""
+        if self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            pygame.display.update(self._previous + self._current)
+        self._previous = self._current
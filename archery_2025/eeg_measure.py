@@ -0,0 +1,114 @@
+import time
+from brainflow.board_shim import BoardShim
+from eeg_replay import create_board
+from eeg_stream import EEGFeatureEngine, MonitorHistory, run_headless
+
+
+class measure():
+    def __init__(self) -> None:
+        pass
+
+    def calcurate(on_update=None, should_stop=None, show_plot=True, board=None):
+        """ボードから脳波を取得し、更新のたびに
+        on_update(timestamp, alpha_energy, beta_energy, ratio) を呼ぶ
+
+        should_stop() がTrueを返すと測定を終了する。boardを省略すると
+        OpenBCI Ganglionボード（COM3）を使う。
+        """
+        if board is None:
+            board = create_board('ganglion')
+
+        # セッションを準備
+        board.prepare_session()
+        print("Session Prepared")
+
+        # サンプリングレートを取得
+        board_id = board.get_board_id()
+        sampling_rate = BoardShim.get_sampling_rate(board_id)   # Ganglionの場合は200
+
+        # EEGチャネルを取得
+        eeg_channels = BoardShim.get_eeg_channels(board_id)
+
+        # 新しいサンプルだけを逐次フィルタするエンジン（3チャネルのみを使用）
+        engine = EEGFeatureEngine(sampling_rate, eeg_channels[:3])
+
+        def publish(engine):
+            if on_update:
+                on_update(time.time(), engine.alpha_energy, engine.beta_energy, engine.ratio)
+
+        if not show_plot:
+            # グラフなしで測定を続ける
+            board.start_stream()
+            print("Streaming started")
+            try:
+                run_headless(board, engine, on_update=publish, should_stop=should_stop)
+            finally:
+                board.stop_stream()
+                board.release_session()
+            return
+
+        # リアルタイムプロットのセットアップ（グラフを出すときだけmatplotlibを読み込む）
+        import matplotlib.pyplot as plt
+        from matplotlib.animation import FuncAnimation
+        fig, ax = plt.subplots(3, 1, sharex=True)
+        # 50秒分の α波・β波・比率 を事前確保した配列に移動平均しながら記録する
+        history = MonitorHistory(3, period=50, window_size=5)
+        alpha_ln, = ax[0].plot([], [], 'b-', animated=True, label='Alpha')
+        beta_ln, = ax[1].plot([], [], 'r-', animated=True, label='Beta')
+        ratio_ln, = ax[2].plot([], [], 'g-', animated=True, label='ratio')
+
+        # エネルギーとその比率を表示するテキスト要素
+        alpha_energy_text = ax[0].text(0.02, 0.95, '', transform=ax[0].transAxes, animated=True)
+        beta_energy_text = ax[1].text(0.02, 0.95, '', transform=ax[1].transAxes, animated=True)
+        ratio_text = ax[2].text(0.02, 0.95, '', transform=ax[2].transAxes, animated=True)
+        artists = (alpha_ln, beta_ln, ratio_ln, alpha_energy_text, beta_energy_text, ratio_text)
+
+        def init():
+            for a in ax:
+                a.set_xlim(0, 50)  # 50秒間のデータを表示
+                if a==ax[0] or a==ax[1]:
+                    a.set_ylim(-100, 100)  # α波とβ波の値の範囲を設定
+                else:
+                    a.set_ylim(0, 5)  # 比率の値の範囲を設定
+                a.legend(loc='upper right')
+            return artists
+
+        def update(frame):
+            if should_stop and should_stop():
+                plt.close(fig)
+            if not engine.poll(board):  # 前回以降の新しいデータだけを処理
+                return artists
+
+            # エネルギーの計算
+            alpha_energy = engine.alpha_energy
+            beta_energy = engine.beta_energy
+            ratio = engine.ratio
+            publish(engine)
+
+            # テキスト要素の更新
+            alpha_energy_text.set_text(f'Alpha Energy: {alpha_energy:.2f} µV²')
+            beta_energy_text.set_text(f'Beta Energy: {beta_energy:.2f} µV²')
+            ratio_text.set_text(f'Beta/Alpha Ratio: {ratio:.2f}')
+
+            history.append(time.time(), engine.alpha_sample, engine.beta_sample, ratio)
+
+            # 移動平均は記録時に計算済みなので、記録済み部分を渡すだけでよい
+            times = history.recorded_times()
+            alpha_ln.set_data(times, history.series(0))
+            beta_ln.set_data(times, history.series(1))
+            ratio_ln.set_data(times, history.series(2))
+
+            return artists
+        # リアルタイムプロットのアニメーション
+        ani = FuncAnimation(fig, update, init_func=init, blit=True, interval=30)  # 30ミリ秒ごとに更新
+
+        # ボードからストリーミングを開始
+        board.start_stream()
+        print("Streaming started")
+
+        # プロットを表示
+        plt.show()
+
+        # ストリーミングを停止してセッションを終了
+        board.stop_stream()
+        board.release_session()
@@ -0,0 +1,58 @@
+import numpy as np
+import pygame
+from eeg_stream import MovingAverage, RingBuffer
+
+
+class PygameMonitor:
+    """ゲーム画面内に比率の波形を描く軽量なオシロスコープ表示
+
+    1フレームに1サンプルを記録し、横幅1ピクセルを1サンプルとして右から左へ流す。
+    枠・目盛りは最初に一度だけ描画したものを使い回し、毎フレームそれで表示領域全体を塗り直す。
+    ラベルは「ratio」を一度だけ描画し、数値は表示する文字列が変わったときだけ描き直す。
+    """
+    def __init__(self, rect, y_max=5.0, window_size=5, color=(0, 200, 0)):
+        self.rect = pygame.Rect(rect)
+        self.y_max = y_max
+        self.color = color
+        self.samples = RingBuffer(self.rect.width)
+        self.average = MovingAverage(window_size)
+        self.latest = 0.0
+        self._xs = np.arange(self.rect.left, self.rect.right, dtype=np.float64)
+        self.background = self._render_background()
+        self.font = pygame.font.SysFont(None, 28)
+        self._label = self.font.render('ratio ', True, self.color)
+        self._value_text = None
+        self._value = None
+
+    def _render_background(self):
+        background = pygame.Surface(self.rect.size)
+        background.fill((20, 20, 20))
+        # 比率1ごとに目盛り線を引く
+        for level in range(1, int(self.y_max)):
+            y = self.rect.height - 1 - level / self.y_max * (self.rect.height - 1)
+            pygame.draw.line(background, (60, 60, 60), (0, y), (self.rect.width, y))
+        pygame.draw.rect(background, (200, 200, 200), background.get_rect(), 1)
+        # 不透明にしておく（半透明だと前のフレームの波形の上に重ねたときに透けて残る）
+        return background.convert()
+
+    def push(self, ratio):
+        """最新の比率を1サンプル追加する"""
+        self.latest = ratio
+        self.samples.extend(np.array([[self.average.update(ratio)]]))
+
+    def draw(self, surface):
+        surface.blit(self.background, self.rect.topleft)
+        values = self.samples.values()[0]
+        if len(values) >= 2:
+            clipped = np.clip(values, 0, self.y_max)
+            ys = self.rect.bottom - 1 - clipped / self.y_max * (self.rect.height - 1)
+            points = np.column_stack((self._xs[-len(values):], ys)).tolist()
+            pygame.draw.lines(surface, self.color, False, points, 2)
+        text = f'{self.latest:.2f}'
+        if text != self._value_text:
+            self._value_text = text
+            self._value = self.font.render(text, True, self.color)
+        x, y = self.rect.left + 6, self.rect.top + 4
+        surface.blit(self._label, (x, y))
+        surface.blit(self._value, (x + self._label.get_width(), y))
+        return self.rect
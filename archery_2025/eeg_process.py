@@ -0,0 +1,134 @@
+import atexit
+import os
+import struct
+import subprocess
+import sys
+from multiprocessing import shared_memory
+
+# 共有メモリのレイアウト: シーケンス番号, 停止フラグ, (timestamp, alpha_energy, beta_energy, ratio)
+_HEADER = struct.Struct('<QQ')
+_VALUES = struct.Struct('<4d')
+RECORD_SIZE = _HEADER.size + _VALUES.size
+MAX_READ_RETRIES = 100
+
+
+def _attach(name):
+    """既存の共有メモリに接続する（削除は作成したプロセスに任せる）"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13以降
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == 'posix':
+            # 子プロセスの終了時にresource_trackerが共有メモリを削除しないよう登録を外す
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+class SharedRatio:
+    """共有メモリ上の脳波の計算結果をseqlockで受け渡すチャネル
+
+    書き込みは測定プロセスだけが行い、ゲーム側はロックを取らずに読み出す。
+    シーケンス番号が奇数の間は書き込み中を表す。
+    """
+    def __init__(self, name=None):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=RECORD_SIZE)
+            self.shm.buf[:RECORD_SIZE] = bytes(RECORD_SIZE)
+            self.owner = True
+        else:
+            self.shm = _attach(name)
+            self.owner = False
+        self._seq = _HEADER.unpack_from(self.shm.buf, 0)[0]
+        self._last = (0.0, 0.0, 0.0, 0.0)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def publish(self, timestamp, alpha_energy, beta_energy, ratio):
+        """計算結果を書き込む（測定プロセス側）"""
+        buf = self.shm.buf
+        self._seq += 1
+        struct.pack_into('<Q', buf, 0, self._seq)  # 奇数: 書き込み中
+        _VALUES.pack_into(buf, _HEADER.size, timestamp, alpha_energy, beta_energy, ratio)
+        self._seq += 1
+        struct.pack_into('<Q', buf, 0, self._seq)
+
+    def read(self):
+        """最新の (timestamp, alpha_energy, beta_energy, ratio) を返す（ゲーム側）
+
+        書き込みと重なった場合は読み直し、それでも取れなければ前回の値を返す。
+        """
+        buf = self.shm.buf
+        for _ in range(MAX_READ_RETRIES):
+            seq_before = struct.unpack_from('<Q', buf, 0)[0]
+            if seq_before & 1:
+                continue
+            values = _VALUES.unpack_from(buf, _HEADER.size)
+            if struct.unpack_from('<Q', buf, 0)[0] == seq_before:
+                self._last = values
+                break
+        return self._last
+
+    def request_stop(self):
+        struct.pack_into('<Q', self.shm.buf, 8, 1)
+
+    def stop_requested(self):
+        return struct.unpack_from('<Q', self.shm.buf, 8)[0] != 0
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def start_acquisition_process(show_plot=True, source='ganglion', recording=None):
+    """脳波の測定・計算・グラフ表示を別プロセスで開始し、(プロセス, チャネル) を返す
+
+    子プロセスはゲームのモジュールを読み込まないよう、このファイルをスクリプトとして起動する。
+    source, recordingはeeg_replay.create_board()と同じ。
+    """
+    channel = SharedRatio()
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    args = [sys.executable, os.path.join(script_dir, 'eeg_process.py'), channel.name, '--source', source]
+    if recording:
+        args += ['--recording', os.path.abspath(recording)]
+    if not show_plot:
+        args.append('--headless')
+    process = subprocess.Popen(args, cwd=script_dir)
+    atexit.register(stop_acquisition_process, process, channel)
+    return process, channel
+
+
+def stop_acquisition_process(process, channel, timeout=3):
+    """測定プロセスに停止を要求し、終了後に共有メモリを解放する"""
+    if process.poll() is None:
+        channel.request_stop()
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.terminate()
+            process.wait()
+    if channel.shm.buf is not None:
+        channel.close()
+
+
+if __name__ == '__main__':
+    import argparse
+    from eeg_measure import measure
+    from eeg_replay import create_board
+
+    parser = argparse.ArgumentParser(description='脳波の測定プロセス')
+    parser.add_argument('name', help='共有メモリの名前')
+    parser.add_argument('--source', default='ganglion')
+    parser.add_argument('--recording', default=None)
+    parser.add_argument('--headless', action='store_true')
+    args = parser.parse_args()
+
+    channel = SharedRatio(args.name)
+    try:
+        measure.calcurate(channel.publish, channel.stop_requested, show_plot=not args.headless,
+                          board=create_board(args.source, recording=args.recording))
+    finally:
+        channel.close()
@@ -0,0 +1,184 @@
+import argparse
+import time
+import numpy as np
+from brainflow.board_shim import BoardShim, BrainFlowInputParams, BoardIds
+from eeg_stream import EEGFeatureEngine
+
+
+def record(board, path, duration, interval=0.03):
+    """ボードの生データをタイムスタンプ付きでnpzファイルに保存する
+
+    EEGチャネルはfloat32、タイムスタンプはfloat64で保存する。
+    """
+    board_id = board.get_board_id()
+    eeg_channels = BoardShim.get_eeg_channels(board_id)
+    timestamp_channel = BoardShim.get_timestamp_channel(board_id)
+
+    chunks = []
+    end_time = time.time() + duration
+    while time.time() < end_time:
+        data = board.get_board_data()
+        if data.shape[1] > 0:
+            chunks.append(data)
+        time.sleep(interval)
+    data = np.concatenate(chunks, axis=1) if chunks else np.zeros((timestamp_channel + 1, 0))
+
+    np.savez_compressed(
+        path,
+        eeg=data[eeg_channels].astype(np.float32),
+        timestamps=data[timestamp_channel].astype(np.float64),
+        eeg_channels=np.asarray(eeg_channels),
+        sampling_rate=BoardShim.get_sampling_rate(board_id),
+        board_id=board_id,
+    )
+    print(f"{data.shape[1]}サンプルを{path}に保存しました")
+
+
+class PlaybackBoard:
+    """記録したファイルをBoardShimと同じ呼び出し方で再生するボード
+
+    speedが1.0なら実時間、2.0なら2倍速で再生する。speedがNoneなら
+    get_board_data()のたびにchunk_sizeサンプルずつ、待たずに返す。
+    """
+    def __init__(self, path, speed=1.0, chunk_size=None, loop=False):
+        with np.load(path) as recording:
+            self.board_id = int(recording['board_id'])
+            self.sampling_rate = int(recording['sampling_rate'])
+            eeg_channels = recording['eeg_channels']
+            eeg = recording['eeg'].astype(np.float64)
+            timestamps = recording['timestamps']
+
+        # ボードと同じ行配置（EEGチャネルの位置）に並べ直しておく
+        self.data = np.zeros((int(eeg_channels.max()) + 1, eeg.shape[1]))
+        self.data[eeg_channels] = eeg
+        if len(timestamps) > 0:
+            self.offsets = timestamps - timestamps[0]
+        else:
+            self.offsets = timestamps
+        self.speed = speed
+        self.chunk_size = chunk_size or max(1, int(self.sampling_rate * 0.03))
+        self.loop = loop
+        self.position = 0
+        self.start_time = None
+
+    @property
+    def num_samples(self):
+        return self.data.shape[1]
+
+    @property
+    def finished(self):
+        return not self.loop and self.position >= self.num_samples
+
+    def get_board_id(self):
+        return self.board_id
+
+    def prepare_session(self):
+        pass
+
+    def start_stream(self):
+        self.position = 0
+        self.start_time = time.perf_counter()
+
+    def stop_stream(self):
+        self.start_time = None
+
+    def release_session(self):
+        pass
+
+    def _available(self):
+        """現在までに届いているはずのサンプル数"""
+        if self.speed is None:
+            return self.position + self.chunk_size
+        elapsed = (time.perf_counter() - self.start_time) * self.speed
+        if self.loop and self.num_samples > 0:
+            duration = self.offsets[-1] + 1 / self.sampling_rate
+            laps, elapsed = divmod(elapsed, duration)
+            return int(laps) * self.num_samples + int(np.searchsorted(self.offsets, elapsed, side='right'))
+        return int(np.searchsorted(self.offsets, elapsed, side='right'))
+
+    def get_board_data(self):
+        """前回の呼び出し以降に届いたサンプルを返す"""
+        if self.start_time is None or self.num_samples == 0:
+            return self.data[:, :0]
+        end = self._available()
+        if not self.loop:
+            end = min(end, self.num_samples)
+        if end <= self.position:
+            return self.data[:, :0]
+        indices = np.arange(self.position, end) % self.num_samples
+        self.position = end
+        return self.data[:, indices]
+
+    def get_current_board_data(self, num_samples):
+        """直近num_samples個のサンプルを返す（バッファからは取り除かない）"""
+        end = self.position if self.loop else min(self.position, self.num_samples)
+        indices = np.arange(max(0, end - num_samples), end) % max(1, self.num_samples)
+        return self.data[:, indices]
+
+
+def create_board(source='ganglion', serial_port='COM3', recording=None, speed=1.0):
+    """測定に使うボードを作成する
+
+    source: "ganglion"（OpenBCI Ganglion）、"synthetic"（BrainFlowの疑似ボード）、
+    "replay"（recordingに指定したファイルを再生）
+    """
+    if source == 'replay':
+        return PlaybackBoard(recording, speed=speed, loop=True)
+    params = BrainFlowInputParams()
+    if source == 'synthetic':
+        return BoardShim(BoardIds.SYNTHETIC_BOARD, params)
+    params.serial_port = serial_port  # シリアルポートを指定
+    return BoardShim(BoardIds.GANGLION_BOARD, params)
+
+
+def benchmark(path, chunk_size=None):
+    """記録ファイルを待ち時間なしで処理し、スループットと1チャンクあたりの処理時間を測る"""
+    board = PlaybackBoard(path, speed=None, chunk_size=chunk_size)
+    eeg_channels = BoardShim.get_eeg_channels(board.get_board_id())
+    engine = EEGFeatureEngine(board.sampling_rate, eeg_channels[:3])  # 3チャネルのみを使用
+
+    latencies = []
+    board.start_stream()
+    start = time.perf_counter()
+    while not board.finished:
+        chunk_start = time.perf_counter()
+        engine.poll(board)
+        engine.ratio
+        latencies.append(time.perf_counter() - chunk_start)
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1e6
+    print(f"samples: {engine.samples_processed}  chunk: {board.chunk_size}  "
+          f"throughput: {engine.samples_processed / elapsed:,.0f} samples/s")
+    print(f"per-chunk latency [us]: p50={np.percentile(latencies, 50):.1f} "
+          f"p99={np.percentile(latencies, 99):.1f} max={latencies.max():.1f}")
+    print(f"final ratio: {engine.ratio:.4f}")
+    return engine
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='脳波データの記録・再生ベンチマーク')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = subparsers.add_parser('record', help='ボードの生データを記録する')
+    record_parser.add_argument('path')
+    record_parser.add_argument('duration', type=float, help='記録する秒数')
+    record_parser.add_argument('--source', choices=['ganglion', 'synthetic'], default='ganglion')
+    record_parser.add_argument('--serial-port', default='COM3')
+
+    bench_parser = subparsers.add_parser('bench', help='記録ファイルでフィルタ処理の速度を測る')
+    bench_parser.add_argument('path')
+    bench_parser.add_argument('--chunk-size', type=int, default=None)
+
+    args = parser.parse_args()
+    if args.command == 'record':
+        board = create_board(args.source, serial_port=args.serial_port)
+        board.prepare_session()
+        board.start_stream()
+        try:
+            record(board, args.path, args.duration)
+        finally:
+            board.stop_stream()
+            board.release_session()
+    else:
+        benchmark(args.path, chunk_size=args.chunk_size)
@@ -0,0 +1,230 @@
+import time
+import numpy as np
+from scipy.signal import butter, lfilter, lfilter_zi
+
+# 周波数帯域の設定（Hz）
+ALPHA_BAND = (8.0, 13.0)
+BETA_BAND = (13.0, 30.0)
+
+
+def hard_threshold(data, threshold):
+    """しきい値を超える値をアーチファクトとみなして0にする"""
+    return np.where(np.abs(data) > threshold, 0, data)
+
+
+class RingBuffer:
+    """固定長のNumPyリングバッファ（行ごとの合計値を逐次更新する）"""
+    def __init__(self, size, rows=1):
+        self.size = size
+        self.data = np.zeros((rows, size))
+        self.index = 0
+        self.count = 0
+        self.total = np.zeros(rows)
+
+    def extend(self, values):
+        """values: (行数, サンプル数) の配列を追加する（古い値は上書きされる）"""
+        values = values[:, -self.size:]
+        n = values.shape[1]
+        if n == 0:
+            return
+        end = self.index + n
+        if end <= self.size:
+            # 上書きされる値を合計から引き、新しい値を足す
+            self.total += values.sum(axis=1) - self.data[:, self.index:end].sum(axis=1)
+            self.data[:, self.index:end] = values
+        else:
+            first = self.size - self.index
+            self.data[:, self.index:] = values[:, :first]
+            self.data[:, :end - self.size] = values[:, first:]
+        self.count = min(self.count + n, self.size)
+        self.index = end % self.size
+        if end >= self.size:
+            # 浮動小数点誤差が蓄積しないよう一周ごとに合計を計算し直す
+            self.total = self.data.sum(axis=1)
+
+    def mean(self):
+        """行ごとの平均値を返す"""
+        if self.count == 0:
+            return np.zeros(len(self.total))
+        return self.total / self.count
+
+    def values(self):
+        """古い順に並べた値を返す"""
+        if self.count < self.size:
+            return self.data[:, :self.count].copy()
+        return np.roll(self.data, -self.index, axis=1)
+
+    def clear(self):
+        self.data.fill(0)
+        self.index = 0
+        self.count = 0
+        self.total = np.zeros(len(self.total))
+
+
+class MovingAverage:
+    """直近window_size個の値の移動平均を1サンプルずつ計算する"""
+    def __init__(self, window_size):
+        self.window = [0.0] * window_size
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+
+    def update(self, value):
+        self.total += value - self.window[self.index]
+        self.window[self.index] = value
+        self.index = (self.index + 1) % len(self.window)
+        self.count = min(self.count + 1, len(self.window))
+        return self.total / self.count
+
+    def reset(self):
+        self.window = [0.0] * len(self.window)
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+
+
+class MonitorHistory:
+    """グラフ表示用に、時刻と平滑化した値を事前確保した配列に記録する
+
+    時刻はperiod秒で折り返し、折り返したら先頭から書き直す。
+    """
+    def __init__(self, num_series, period=50, capacity=2048, window_size=5):
+        self.period = period
+        self.times = np.zeros(capacity)
+        self.values = np.zeros((num_series, capacity))
+        self.averages = [MovingAverage(window_size) for _ in range(num_series)]
+        self.length = 0
+
+    def append(self, timestamp, *values):
+        t = timestamp % self.period
+        if self.length and (t < self.times[self.length - 1] or self.length == len(self.times)):
+            self.clear()
+        self.times[self.length] = t
+        for i, value in enumerate(values):
+            self.values[i, self.length] = self.averages[i].update(value)
+        self.length += 1
+
+    def series(self, index):
+        """index番目の系列（記録済みの部分のビュー）"""
+        return self.values[index, :self.length]
+
+    def recorded_times(self):
+        return self.times[:self.length]
+
+    def clear(self):
+        self.length = 0
+        for average in self.averages:
+            average.reset()
+
+
+class BandFilter:
+    """チャネルごとの内部状態を保持する因果的IIRバンドパスフィルタ"""
+    def __init__(self, sampling_rate, low, high, order=2):
+        self.b, self.a = butter(order, [low, high], btype='bandpass', fs=sampling_rate)
+        self._zi_unit = lfilter_zi(self.b, self.a)
+        self.zi = None
+
+    def process(self, chunk):
+        """chunk: (チャネル数, サンプル数) の配列。前回の続きとしてフィルタをかける"""
+        if self.zi is None:
+            # 最初のサンプルで定常状態に初期化して立ち上がりの過渡応答を抑える
+            self.zi = chunk[:, :1] * self._zi_unit
+        filtered, self.zi = lfilter(self.b, self.a, chunk, axis=-1, zi=self.zi)
+        return filtered
+
+    def reset(self):
+        self.zi = None
+
+
+class EEGFeatureEngine:
+    """新しいサンプルだけを処理してα波・β波のエネルギーを逐次計算するエンジン
+
+    1秒分の窓を毎回フィルタし直す代わりに、フィルタの状態を持ち越し、
+    帯域信号の2乗をリングバッファに貯めて窓内の平均エネルギーを求める。
+    """
+    def __init__(self, sampling_rate, eeg_channels, window_seconds=1.0, threshold=150):
+        self.sampling_rate = sampling_rate
+        self.eeg_channels = list(eeg_channels)
+        self.threshold = threshold
+        window_size = int(sampling_rate * window_seconds)
+        self.alpha_filter = BandFilter(sampling_rate, *ALPHA_BAND)
+        self.beta_filter = BandFilter(sampling_rate, *BETA_BAND)
+        # 0行目がα波、1行目がβ波の2乗値
+        self.band_power = RingBuffer(window_size, rows=2)
+        self.alpha_sample = 0.0  # 最新のα波（チャネル平均）
+        self.beta_sample = 0.0  # 最新のβ波（チャネル平均）
+        self.samples_processed = 0
+
+    def push(self, data):
+        """ボードから取得した新しいデータ（行がボードのチャネル）を処理する
+
+        新しいサンプルがなければFalseを返す。
+        """
+        if data.shape[1] == 0:
+            return False
+        eeg = np.asarray(data[self.eeg_channels], dtype=np.float64)
+
+        bands = np.stack((self.alpha_filter.process(eeg), self.beta_filter.process(eeg)))
+        bands = hard_threshold(bands, self.threshold).mean(axis=1)  # チャネル平均
+
+        self.band_power.extend(bands * bands)
+        self.alpha_sample = float(bands[0, -1])
+        self.beta_sample = float(bands[1, -1])
+        self.samples_processed += data.shape[1]
+        return True
+
+    def poll(self, board):
+        """ボードに溜まった未処理のサンプルだけを取り出して処理する"""
+        return self.push(board.get_board_data())
+
+    @property
+    def alpha_energy(self):
+        return float(self.band_power.mean()[0])
+
+    @property
+    def beta_energy(self):
+        return float(self.band_power.mean()[1])
+
+    @property
+    def ratio(self):
+        alpha_energy, beta_energy = self.band_power.mean()
+        return float(2 * beta_energy / alpha_energy) if alpha_energy != 0 else 0
+
+    def reset(self):
+        self.alpha_filter.reset()
+        self.beta_filter.reset()
+        self.band_power.clear()
+        self.alpha_sample = 0.0
+        self.beta_sample = 0.0
+        self.samples_processed = 0
+
+
+def run_headless(board, engine, interval=0.03, on_update=None, should_stop=None):
+    """グラフを表示せずにボードを読み続け、更新のたびにon_update(engine)を呼ぶ"""
+    while not (should_stop and should_stop()):
+        if engine.poll(board) and on_update:
+            on_update(engine)
+        time.sleep(interval)
+
+
+if __name__ == '__main__':
+    from brainflow.board_shim import BoardShim, BrainFlowInputParams, BoardIds
+
+    params = BrainFlowInputParams()
+    params.serial_port = 'COM3'  # シリアルポートを指定
+    board = BoardShim(BoardIds.GANGLION_BOARD, params)
+    board.prepare_session()
+    sampling_rate = BoardShim.get_sampling_rate(BoardIds.GANGLION_BOARD)
+    eeg_channels = BoardShim.get_eeg_channels(BoardIds.GANGLION_BOARD)
+    engine = EEGFeatureEngine(sampling_rate, eeg_channels[:3])  # 3チャネルのみを使用
+
+    board.start_stream()
+    print("Streaming started (headless)")
+    try:
+        run_headless(board, engine, interval=0.5, on_update=lambda e: print(
+            f'Alpha: {e.alpha_energy:.2f} µV²  Beta: {e.beta_energy:.2f} µV²  Ratio: {e.ratio:.2f}'))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        board.stop_stream()
+        board.release_session()
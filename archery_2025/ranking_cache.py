@@ -0,0 +1,49 @@
+import hashlib
+import json
+import threading
+import time
+
+
+class RankingCache:
+    """ランキングの応答をメモリに保持し、スコアが追加されたときだけ作り直す
+
+    build(key)で作った内容を、JSONにしたバイト列とETagと一緒にkeyごとに保存する。
+    invalidate()で全て破棄して版を進め、wait_for_update()で待っている
+    スレッド（SSEの接続）を起こす。
+    """
+    def __init__(self, build):
+        self.build = build
+        self.version = 0
+        self.last_modified = time.time()
+        self._entries = {}
+        self._condition = threading.Condition()
+
+    def get(self, key=None):
+        """keyの (データ, JSONのバイト列, ETag) を返す"""
+        entry = self._entries.get(key)
+        if entry is None:
+            with self._condition:
+                version = self.version
+            data = self.build(key)
+            body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+            etag = f'{version}-{hashlib.md5(body).hexdigest()[:16]}'
+            entry = (data, body, etag)
+            with self._condition:
+                # 作っている間にスコアが追加されていたら保存しない（古い内容が残らないように）
+                if version == self.version:
+                    self._entries[key] = entry
+        return entry
+
+    def invalidate(self):
+        """スコアの追加後に呼ぶ"""
+        with self._condition:
+            self._entries = {}
+            self.version += 1
+            self.last_modified = time.time()
+            self._condition.notify_all()
+
+    def wait_for_update(self, version, timeout=None):
+        """版がversionから進むまで待ち、新しい版を返す（timeoutで諦めたら同じ版）"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
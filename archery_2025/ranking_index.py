@@ -0,0 +1,55 @@
+import threading
+
+
+class RankingIndex:
+    """モード別・日付別のランキングを、データベースのインデックスから必要な分だけ読む
+
+    全履歴をメモリに読み込まないので、起動時間とメモリは履歴の件数によらない。
+    順位は同点なら同じ順位（自分より高いスコアの数 + 1）。同点の並びは先に登録した方が上。
+    絞り込んだ件数はスコアが追加されるまで覚えておく。
+    """
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._counts = {}  # (モード, 日付) -> 件数
+
+    def invalidate(self):
+        """スコアの追加後に呼ぶ"""
+        with self._lock:
+            self._counts = {}
+
+    def count(self, mode=None, day=None):
+        with self._lock:
+            count = self._counts.get((mode, day))
+        if count is None:
+            count = self.store.count(mode, day)
+            with self._lock:
+                self._counts[(mode, day)] = count
+        return count
+
+    def page(self, mode=None, day=None, offset=0, limit=100):
+        """絞り込んだランキングのoffset位置からlimit件を、順位（rank）を付けて返す"""
+        entries = self.store.top(limit, mode, day, offset)
+        rank = None
+        for i, entry in enumerate(entries):
+            if i == 0:
+                rank = self.rank_of_score(entry['total_score'], mode, day)  # 前のページと同点のことがある
+            elif entry['total_score'] != entries[i - 1]['total_score']:
+                rank = offset + i + 1  # 前の行までは全て自分より高い
+            entry['rank'] = rank
+        return entries
+
+    def rank_of_score(self, total_score, mode=None, day=None):
+        """このスコアが絞り込んだランキングで何位になるかを返す"""
+        return self.store.count_above(total_score, mode, day) + 1
+
+    def rank_of_id(self, entry_id, mode=None, day=None):
+        """登録済みのスコアの順位を返す（見つからないか絞り込みに合わなければNone）"""
+        entry = self.store.get(entry_id)
+        if entry is None:
+            return None
+        if mode is not None and entry['game_mode'] != mode:
+            return None
+        if day is not None and entry['date'][:10] != day:
+            return None
+        return self.rank_of_score(entry['total_score'], mode, day)
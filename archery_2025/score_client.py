@@ -0,0 +1,153 @@
+import json
+import os
+import queue
+import threading
+import uuid
+import requests
+
+_STOP = object()
+
+
+class ScoreSubmitter:
+    """スコアをバックグラウンドでWebサーバーに送信するクライアント
+
+    submit()はキューに入れるだけですぐに戻る。送信待ちのスコアは
+    queue_fileにJSON Lines形式で保存し、送信に失敗したら
+    retry_interval秒ごとに再送する（次回起動時も残りを送る）。
+    送信はまとめて /submit_scores に行い、接続はSessionで使い回す。
+    各スコアにはclient_idを付けるので、届いたのに応答が受け取れず再送しても
+    サーバーには1件だけ登録される。サーバーが受け付けなかったスコアは
+    rejected_fileに移し、再送しない。
+    """
+    def __init__(self, server_url='http://localhost:5000', queue_file='pending_scores.jsonl',
+                 batch_size=20, retry_interval=5.0, timeout=5, rejected_file='rejected_scores.jsonl'):
+        self.server_url = server_url.rstrip('/')
+        self.queue_file = queue_file
+        self.rejected_file = rejected_file
+        self.batch_size = batch_size
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._queue = queue.Queue()
+        self._pending = self._load_pending()
+        self._offline = False  # 接続できないメッセージを再送のたびに出さないため
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def pending_count(self):
+        return len(self._pending)
+
+    def submit(self, data):
+        """スコアを送信キューに追加する（ネットワークを待たない）"""
+        self._queue.put(dict(data, client_id=data.get('client_id') or uuid.uuid4().hex))
+
+    def close(self, timeout=2):
+        """残りを送信してからワーカーを止める（timeout秒で諦める）"""
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self.session.close()
+
+    def _load_pending(self):
+        """前回送れなかったスコアを読み込む"""
+        if not os.path.exists(self.queue_file):
+            return []
+        pending = []
+        with open(self.queue_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    pending.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # 書き込み途中で終了した行は読み飛ばす
+        missing = [data for data in pending if isinstance(data, dict) and 'client_id' not in data]
+        if missing:
+            # 以前の形式で保存されたスコアにもidを付けて保存し直す（再送のたびに変わらないように）
+            for data in missing:
+                data['client_id'] = uuid.uuid4().hex
+            self._pending = pending
+            self._save_pending()
+        return pending
+
+    def _save_pending(self):
+        tmp_file = self.queue_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for data in self._pending:
+                f.write(json.dumps(data, ensure_ascii=False) + '\n')
+        os.replace(tmp_file, self.queue_file)
+
+    def _append_pending(self, data):
+        self._pending.append(data)
+        with open(self.queue_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(data, ensure_ascii=False) + '\n')
+
+    def _reject(self, indices, batch):
+        """サーバーが受け付けなかったスコアを送信待ちから除き、rejected_fileに移す"""
+        rejected = [batch[i] for i in sorted(set(indices)) if 0 <= i < len(batch)]
+        with open(self.rejected_file, 'a', encoding='utf-8') as f:
+            for data in rejected:
+                f.write(json.dumps(data, ensure_ascii=False) + '\n')
+        rejected_ids = {id(data) for data in rejected}
+        self._pending = [data for data in self._pending if id(data) not in rejected_ids]
+        self._save_pending()
+        print(f"サーバーが受け付けなかったスコアを{self.rejected_file}に移しました（{len(rejected)}件）")
+
+    def _run(self):
+        stopping = False
+        while True:
+            # 新しいスコアを待つ（送信待ちがあれば一定時間ごとに再送）
+            try:
+                item = self._queue.get(timeout=self.retry_interval if self._pending else None)
+            except queue.Empty:
+                item = None
+            while item is not None:
+                if item is _STOP:
+                    stopping = True
+                else:
+                    self._append_pending(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+
+            while self._pending and self._flush_batch():
+                pass
+            if stopping:
+                break
+
+    def _flush_batch(self):
+        """送信待ちの先頭からbatch_size件を送る。成功したらTrueを返す"""
+        batch = self._pending[:self.batch_size]
+        try:
+            response = self.session.post(f'{self.server_url}/submit_scores',
+                                         json={'scores': batch}, timeout=self.timeout)
+            if response.status_code in (400, 422):
+                # 正しくないスコアがあった（1件も登録されていない）。それを除けば残りは次で送れる
+                try:
+                    invalid = response.json().get('invalid')
+                except ValueError:
+                    invalid = None
+                if not isinstance(invalid, list) or not invalid:
+                    invalid = range(len(batch))  # どれか分からなければまとめて除く
+                self._reject(invalid, batch)
+                return True
+            if response.status_code != 200:
+                print(f"スコアの送信に失敗しました: HTTP {response.status_code}")
+                return False
+            result = response.json()
+            if not result.get('success'):
+                print(f"スコアの送信に失敗しました: {result.get('message')}")
+                return False
+        except requests.exceptions.ConnectionError:
+            if not self._offline:
+                print("Webサーバーに接続できません。サーバーが起動したら自動で再送します。")
+                self._offline = True
+            return False
+        except Exception as e:
+            print(f"サーバーとの通信エラー: {e}")
+            return False
+
+        self._offline = False
+        del self._pending[:len(batch)]
+        self._save_pending()
+        print(f"スコアをサーバーに送信しました（{len(batch)}件）")
+        return True
@@ -0,0 +1,191 @@
+import argparse
+import time
+import numpy as np
+from aim_sim import SIM_DT
+import archery_game as game
+
+# archery_game.pyの値（フルスクリーン用）。settingsで渡した値だけ上書きして使う
+FULLSCREEN_SETTINGS = {name: getattr(game, name) for name in game.SIZE_SETTINGS}
+AUTO_SHOOT_SECONDS = game.AUTO_SHOOT_TIME / 1000
+
+
+def engine_params(game_mode, screen_size=(1920, 1080), settings=None):
+    """ゲームと同じ設定・計算で (照準のパラメータ, 照準の最初の半径, 得点範囲) を返す
+
+    settingsはarchery_game.run()に渡すものと同じSIZE_SETTINGSの辞書（without_OpenBCI.pyのWINDOWED_SETTINGSなど）。
+    """
+    game.apply_settings({**FULLSCREEN_SETTINGS, **(settings or {})})
+    game.WIDTH, game.HEIGHT = screen_size
+    game.game_mode = game_mode
+    game.update_target_size()
+    game.update_score_ranges()
+    return game.make_aim_params(), game.initial_aim_radius, game.score_ranges
+
+
+def random_points_in_circle(rng, cx, cy, radius, wind):
+    """円内の一様な点をまとめて選ぶ（windが0でなければ風の影響を加えて整数に切り捨てる）"""
+    n = len(radius)
+    angle = rng.uniform(0, 2 * np.pi, n)
+    r = radius * np.sqrt(rng.uniform(0, 1, n))
+    x = cx + r * np.cos(angle)
+    y = cy + r * np.sin(angle)
+    if wind:
+        x += rng.uniform(-wind, wind, n)
+        y += rng.uniform(-wind, wind, n)
+    return np.trunc(x), np.trunc(y)
+
+
+def step_many(state, params, ratio, rng):
+    """aim_sim.step()をまとめて行う。state (x, y, target_x, target_y, radius) の配列をその場で更新する
+
+    np.hypotは遅いので距離は2乗和の平方根で求める。
+    """
+    x, y, target_x, target_y, radius = state
+    sway_radius = params.initial_sway_radius + 50 * ratio
+    sway_speed = params.sway_speed
+    if params.hard:
+        sway_radius += 30 * ratio
+        sway_speed += 1
+
+    dx = target_x - x
+    dy = target_y - y
+    squared = dx * dx + dy * dy
+    # 目標地点に着いた照準だけ次の目標地点を選ぶ
+    arrived = np.flatnonzero(squared < 1)
+    if len(arrived):
+        target_x[arrived], target_y[arrived] = random_points_in_circle(
+            rng, params.center[0], params.center[1], sway_radius[arrived], params.wind if params.hard else 0)
+        dx[arrived] = target_x[arrived] - x[arrived]
+        dy[arrived] = target_y[arrived] - y[arrived]
+        squared[arrived] = dx[arrived] ** 2 + dy[arrived] ** 2
+
+    # 距離が0ならdx, dyも0なので、0で割らないようにするだけでよい
+    scale = sway_speed / np.maximum(np.sqrt(squared, out=squared), 1e-12)
+    x += dx * scale
+    y += dy * scale
+
+    min_radius = params.initial_min + 130 * ratio
+    expand = radius < min_radius
+    np.maximum(radius - params.shrink_rate, min_radius, out=radius)
+    np.add(min_radius, params.shrink_rate, out=radius, where=expand)
+
+
+def score_hits(hit_x, hit_y, center, score_ranges):
+    """archery_game.pyのcalculate_score()をまとめて行う（score_rangesは内側の得点から順）"""
+    points = np.array(list(score_ranges) + [0], dtype=np.int8)
+    ring_radii = np.array(list(score_ranges.values()))
+    distance = np.sqrt((hit_x - center[0]) ** 2 + (hit_y - center[1]) ** 2)
+    return points[np.searchsorted(ring_radii, distance, side='left')]
+
+
+def simulate_scores(ratios, game_mode="Normal", num_trials=1_000_000, shot_seconds=(3, AUTO_SHOOT_SECONDS),
+                    screen_size=(1920, 1080), settings=None, batch_size=16384, seed=None):
+    """比率の時系列（SIM_DTごと）を使って、照準の揺れから射撃までをnum_trials回まとめて行い、得点の配列を返す
+
+    各試行は比率の時系列のランダムな位置から始まり（末尾まで行ったら先頭に戻る）、
+    shot_seconds=(最短, 最長) の間の一様な時刻に射る。数値1つなら全試行その時刻に射る。
+    照準と的はscreen_sizeの画面でsettingsを渡したときのゲームと同じ（engine_params()）。
+    batch_sizeは配列がCPUキャッシュに収まる程度にすると速い。
+    """
+    ratios = np.asarray(ratios, dtype=np.float64)
+    # 末尾から先頭に戻る分を後ろに付け足しておき、試行ごとの比率を割り算なしで取り出す
+    max_steps = int(round(max(np.atleast_1d(shot_seconds)) / SIM_DT))
+    looped_ratios = np.resize(ratios, len(ratios) + max_steps)
+    rng = np.random.default_rng(seed)
+    params, initial_radius, score_ranges = engine_params(game_mode, screen_size, settings)
+    center = params.center
+    low, high = (shot_seconds, shot_seconds) if np.isscalar(shot_seconds) else shot_seconds
+
+    results = []
+    for start in range(0, num_trials, batch_size):
+        n = min(batch_size, num_trials - start)
+        offsets = rng.integers(len(ratios), size=n)
+        # 試行の順番は入れ替えても同じなので、射るのが遅い試行から順に並んでいるとみなし、
+        # kステップ目はまだ射ていない先頭のm個だけを更新する
+        shot_steps = np.sort(np.round(rng.uniform(low, high, n) / SIM_DT).astype(np.int64))
+        active_counts = n - np.searchsorted(shot_steps, np.arange(shot_steps[-1]), side='right')
+
+        state = (np.full(n, float(center[0])), np.full(n, float(center[1])),
+                 np.full(n, float(center[0])), np.full(n, float(center[1])),
+                 np.full(n, float(initial_radius)))
+        for k, m in enumerate(active_counts):
+            active = tuple(array[:m] for array in state)
+            step_many(active, params, looped_ratios[offsets[:m] + k], rng)
+
+        aim_x, aim_y, _, _, aim_radius = state
+        hit_x, hit_y = random_points_in_circle(rng, aim_x, aim_y, aim_radius, params.wind if params.hard else 0)
+        results.append(score_hits(hit_x, hit_y, center, score_ranges))
+    return np.concatenate(results)
+
+
+def synthetic_ratios(seconds=600, mean=1.0, std=0.5, correlation_seconds=2.0, seed=None):
+    """SIM_DTごとの疑似的な比率の時系列（平均に戻ろうとするランダムな揺らぎ、0未満は0）"""
+    rng = np.random.default_rng(seed)
+    num_steps = int(seconds / SIM_DT)
+    decay = np.exp(-SIM_DT / correlation_seconds)
+    noise = rng.normal(0, std * np.sqrt(1 - decay ** 2), num_steps)
+    ratios = np.empty(num_steps)
+    value = 0.0
+    for i in range(num_steps):
+        value = decay * value + noise[i]
+        ratios[i] = value
+    return np.maximum(ratios + mean, 0)
+
+
+def ratios_from_recording(path):
+    """eeg_replay.pyで記録したファイルをゲームと同じ処理にかけ、SIM_DTごとの比率の時系列にする"""
+    from brainflow.board_shim import BoardShim
+    from eeg_replay import PlaybackBoard
+    from eeg_stream import EEGFeatureEngine
+
+    board = PlaybackBoard(path, speed=None)
+    eeg_channels = BoardShim.get_eeg_channels(board.get_board_id())
+    engine = EEGFeatureEngine(board.sampling_rate, eeg_channels[:3])  # 3チャネルのみを使用
+    times, ratios = [], []
+    board.start_stream()
+    while not board.finished:
+        engine.poll(board)
+        times.append(engine.samples_processed / board.sampling_rate)
+        ratios.append(engine.ratio)
+    return np.interp(np.arange(0, times[-1], SIM_DT), times, ratios)
+
+
+def summarize(scores):
+    """得点ごとの割合と平均点を返す"""
+    points, counts = np.unique(scores, return_counts=True)
+    distribution = {int(p): c / len(scores) for p, c in zip(points, counts)}
+    return distribution, float(np.mean(scores))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='難易度調整用の得点シミュレーション')
+    parser.add_argument('--recording', default=None, help='eeg_replay.pyで記録したファイル（省略時は疑似的な比率）')
+    parser.add_argument('--mean-ratio', type=float, default=1.0, help='疑似的な比率の平均')
+    parser.add_argument('--trials', type=int, default=1_000_000)
+    parser.add_argument('--mode', choices=['Normal', 'Hard', 'both'], default='both')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--windowed', action='store_true',
+                        help='without_OpenBCI.pyのウィンドウの大きさと設定で計算する（省略時は1920x1080のフルスクリーン）')
+    args = parser.parse_args()
+
+    if args.windowed:
+        import without_OpenBCI
+        screen_size, settings = (without_OpenBCI.WIDTH, without_OpenBCI.HEIGHT), without_OpenBCI.WINDOWED_SETTINGS
+    else:
+        screen_size, settings = (1920, 1080), None
+
+    if args.recording:
+        ratios = ratios_from_recording(args.recording)
+    else:
+        ratios = synthetic_ratios(mean=args.mean_ratio, seed=args.seed)
+    print(f"ratio: mean={ratios.mean():.2f} std={ratios.std():.2f} ({len(ratios) * SIM_DT:.0f}s)")
+
+    modes = ['Normal', 'Hard'] if args.mode == 'both' else [args.mode]
+    for mode in modes:
+        start = time.perf_counter()
+        scores = simulate_scores(ratios, mode, num_trials=args.trials, screen_size=screen_size,
+                                 settings=settings, seed=args.seed)
+        elapsed = time.perf_counter() - start
+        distribution, mean = summarize(scores)
+        table = '  '.join(f"{p}点:{distribution.get(p, 0):6.1%}" for p in (10, 7, 5, 3, 1, 0))
+        print(f"{mode:6s} 平均 {mean:.2f}点  {table}  ({args.trials / elapsed:,.0f} trials/s)")
@@ -0,0 +1,157 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    player_name TEXT NOT NULL,
+    total_score INTEGER NOT NULL,
+    game_mode TEXT NOT NULL,
+    scores TEXT NOT NULL,
+    date TEXT NOT NULL,
+    client_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_scores_mode_total ON scores (game_mode, total_score DESC);
+CREATE INDEX IF NOT EXISTS idx_scores_total ON scores (total_score DESC);
+CREATE INDEX IF NOT EXISTS idx_scores_day_total ON scores (substr(date, 1, 10), total_score DESC);
+CREATE INDEX IF NOT EXISTS idx_scores_mode_day_total ON scores (game_mode, substr(date, 1, 10), total_score DESC);
+'''
+
+# 送信元が付けたid（再送で二重に登録しないため）。以前のデータベースには列を足してから作る
+_CLIENT_ID_INDEX = 'CREATE UNIQUE INDEX IF NOT EXISTS idx_scores_client_id ON scores (client_id)'
+
+
+class ScoreStore:
+    """スコアをSQLiteに保存する（全履歴を保持し、上位・ページはインデックスから読む）
+
+    全体・モード別・日付別・モードと日付別のそれぞれにスコア順のインデックスがあるので、
+    読むのは必要な件数だけ。WALモードなので、書き込み中でも他のスレッド・プロセスから
+    ランキングを読める。接続はスレッドごとに作る。
+    """
+    def __init__(self, path='ranking.db'):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        columns = [row['name'] for row in conn.execute('PRAGMA table_info(scores)')]
+        if 'client_id' not in columns:
+            conn.execute('ALTER TABLE scores ADD COLUMN client_id TEXT')
+        conn.execute(_CLIENT_ID_INDEX)
+        conn.commit()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')  # WALではコミットごとのfsyncを省いても壊れない
+            self._local.conn = conn
+        return conn
+
+    def add(self, player_name, total_score, game_mode, scores, date=None, client_id=None):
+        """スコアを1件追加し、そのスコアのデータを返す"""
+        return self.add_many([(player_name, total_score, game_mode, scores, date, client_id)])[0]
+
+    def add_many(self, entries):
+        """(player_name, total_score, game_mode, scores, date, client_id) のリストを1回のトランザクションで追加する
+
+        dateがNoneなら現在時刻を使う。entriesの1件ごとにスコアのデータ（idつき）を返す。
+        client_idが登録済みのもの（再送されたスコア）は追加せず、登録済みのデータを返す。
+        """
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        results = [None] * len(entries)
+        new = []  # (entriesの位置, 行)
+        conn = self._connect()
+        with conn:
+            # client_idの確認から追加までの間に他の接続が書き込まないようにする
+            conn.execute('BEGIN IMMEDIATE')
+            seen = {}  # client_id -> entriesの位置（同じ送信の中の重複）
+            for i, (player_name, total_score, game_mode, scores, date, client_id) in enumerate(entries):
+                if client_id is not None:
+                    if client_id in seen:
+                        continue
+                    seen[client_id] = i
+                    row = conn.execute('SELECT * FROM scores WHERE client_id = ?', (client_id,)).fetchone()
+                    if row is not None:
+                        results[i] = self._to_dict(row)
+                        continue
+                new.append((i, (player_name, total_score, game_mode,
+                                json.dumps(scores, ensure_ascii=False), date or now, client_id)))
+            if new:
+                conn.executemany('INSERT INTO scores (player_name, total_score, game_mode, scores, date, client_id) '
+                                 'VALUES (?, ?, ?, ?, ?, ?)', [row for _, row in new])
+                # 1つのトランザクションの中なので、追加した行のidは連番になる
+                last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+        if new:
+            first_id = last_id - len(new) + 1
+            for n, (i, _) in enumerate(new):
+                player_name, total_score, game_mode, scores, date, _ = entries[i]
+                results[i] = {'id': first_id + n, 'player_name': player_name, 'total_score': total_score,
+                              'game_mode': game_mode, 'scores': scores, 'date': date or now}
+        for i, entry in enumerate(entries):
+            if results[i] is None:
+                results[i] = results[seen[entry[5]]]
+        return results
+
+    @staticmethod
+    def _where(game_mode=None, day=None):
+        """モード・日付（YYYY-MM-DD）で絞り込むWHERE句とその値"""
+        clauses, params = [], []
+        if game_mode is not None:
+            clauses.append('game_mode = ?')
+            params.append(game_mode)
+        if day is not None:
+            # dateは'YYYY-MM-DD HH:MM:SS'。インデックスと同じ式で日付の部分を比べる
+            clauses.append('substr(date, 1, 10) = ?')
+            params.append(day)
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def top(self, limit=100, game_mode=None, day=None, offset=0):
+        """スコアの高い順にoffset件目からlimit件を返す（同点は先に登録した方が上）"""
+        where, params = self._where(game_mode, day)
+        rows = self._connect().execute(f'SELECT * FROM scores{where} '
+                                       'ORDER BY total_score DESC, id LIMIT ? OFFSET ?',
+                                       params + [limit, offset])
+        return [self._to_dict(row) for row in rows]
+
+    def get(self, score_id):
+        """idのスコアを返す。なければNone"""
+        row = self._connect().execute('SELECT * FROM scores WHERE id = ?', (score_id,)).fetchone()
+        return None if row is None else self._to_dict(row)
+
+    def count(self, game_mode=None, day=None):
+        where, params = self._where(game_mode, day)
+        return self._connect().execute(f'SELECT COUNT(*) FROM scores{where}', params).fetchone()[0]
+
+    def count_above(self, total_score, game_mode=None, day=None):
+        """total_scoreより高いスコアの数"""
+        where, params = self._where(game_mode, day)
+        where = f'{where} AND total_score > ?' if where else ' WHERE total_score > ?'
+        return self._connect().execute(f'SELECT COUNT(*) FROM scores{where}',
+                                       params + [total_score]).fetchone()[0]
+
+    def import_json(self, path):
+        """以前のranking.jsonの内容を取り込む（データベースが空のときだけ）"""
+        if self.count() > 0 or not os.path.exists(path):
+            return 0
+        with open(path, 'r', encoding='utf-8') as f:
+            ranking = json.load(f)
+        self.add_many([(entry['player_name'], entry['total_score'], entry['game_mode'],
+                        entry.get('scores', []), entry.get('date'), None)
+                       for entry in ranking])  # ランキング順に入れて同点の並び順を保つ
+        return len(ranking)
+
+    @staticmethod
+    def _to_dict(row):
+        return {
+            'id': row['id'],
+            'player_name': row['player_name'],
+            'total_score': row['total_score'],
+            'game_mode': row['game_mode'],
+            'scores': json.loads(row['scores']),
+            'date': row['date']
+        }
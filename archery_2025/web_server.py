@@ -1,59 +1,121 @@
-from flask import Flask, render_template, request, jsonify
-import json
-import os
-from datetime import datetime
+from datetime import date
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
+from score_store import ScoreStore
+from ranking_cache import RankingCache
+from ranking_index import RankingIndex
 
 app = Flask(__name__)
 
-# ランキングデータを保存するファイル
+# スコアを保存するデータベース（以前のranking.jsonは初回起動時に取り込む）
+DB_FILE = 'ranking.db'
 RANKING_FILE = 'ranking.json'
+RANKING_LIMIT = 100  # ランキングに表示する件数（データベースには全件残る）
+MAX_PAGE_SIZE = 100  # /rankingのlimitの上限
 
-def load_ranking():
-    """ランキングデータを読み込む"""
-    if os.path.exists(RANKING_FILE):
-        with open(RANKING_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return []
-
-def save_ranking(ranking_data):
-    """ランキングデータを保存する"""
-    with open(RANKING_FILE, 'w', encoding='utf-8') as f:
-        json.dump(ranking_data, f, ensure_ascii=False, indent=2)
-
-def add_score(player_name, total_score, game_mode, scores):
-    """新しいスコアをランキングに追加"""
-    ranking = load_ranking()
-    
-    # game_modeが文字列の場合はそのまま使用、数値の場合は変換
+SSE_KEEPALIVE = 15  # 更新がなくてもこの秒数ごとにコメントを送って接続を保つ
+
+store = ScoreStore(DB_FILE)
+store.import_json(RANKING_FILE)
+
+# モード別・日付別のランキング（データベースのインデックスから必要な分だけ読む）
+ranking_index = RankingIndex(store)
+
+def load_ranking(limit=RANKING_LIMIT):
+    """ランキングデータ（スコアの高い順）を読み込む"""
+    return ranking_index.page(limit=limit)
+
+def build_ranking(key):
+    """keyは (モード, 日付, offset, limit)、Noneは全体の上位RANKING_LIMIT件"""
+    mode, day, offset, limit = key or (None, None, 0, RANKING_LIMIT)
+    return ranking_index.page(mode, day, offset, limit)
+
+# ランキングの応答はスコアが追加されたときだけ作り直す
+ranking_cache = RankingCache(build_ranking)
+
+index_page = (None, '')  # 描画済みのメインページ (ETag, HTML)
+
+def cached_response(body, etag, mimetype):
+    """キャッシュした内容を返す。ブラウザの持つ版と同じなら304を返す"""
+    response = Response(body, mimetype=mimetype)
+    response.set_etag(etag)
+    response.last_modified = ranking_cache.last_modified
+    response.cache_control.no_cache = True  # 毎回ETagで確認させる
+    return response.make_conditional(request)
+
+def mode_display(game_mode):
+    """game_modeが文字列の場合はそのまま使用、数値の場合は変換"""
     if isinstance(game_mode, str):
-        mode_display = 'むずかしい' if game_mode == 'Hard' else 'ふつう'
-    else:
-        mode_display = 'むずかしい' if game_mode == 1 else 'ふつう'
-    
-    new_score = {
-        'player_name': player_name,
-        'total_score': total_score,
-        'game_mode': mode_display,
-        'scores': scores,
-        'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    }
-    
-    ranking.append(new_score)
-    
-    # スコアでソート（降順）
-    ranking.sort(key=lambda x: x['total_score'], reverse=True)
-    
-    # 上位100件のみ保持
-    ranking = ranking[:100]
-    
-    save_ranking(ranking)
-    return ranking
+        return 'むずかしい' if game_mode == 'Hard' else 'ふつう'
+    return 'むずかしい' if game_mode == 1 else 'ふつう'
+
+def parse_mode(mode):
+    """クエリのmode（Normal/Hard または ふつう/むずかしい）を保存されている表記にする。空ならNone"""
+    if not mode:
+        return None
+    if mode in ('Normal', 'Hard'):
+        return mode_display(mode)
+    if mode in ('ふつう', 'むずかしい'):
+        return mode
+    raise ValueError(f'unknown mode: {mode}')
+
+def parse_day(day):
+    """クエリのdate（YYYY-MM-DD または today）を日付の文字列にする。空ならNone"""
+    if not day:
+        return None
+    if day == 'today':
+        return date.today().isoformat()
+    return date.fromisoformat(day).isoformat()  # 形式が違えばValueError
+
+def ranking_key(args):
+    """/rankingのクエリ（mode, date, offset, limit）からランキングのキャッシュのkeyを作る"""
+    offset = max(args.get('offset', 0, type=int), 0)
+    limit = min(max(args.get('limit', RANKING_LIMIT, type=int), 0), MAX_PAGE_SIZE)
+    return (parse_mode(args.get('mode')), parse_day(args.get('date')), offset, limit)
+
+def is_valid_score(data):
+    """送信されたスコアのデータが登録できる形かどうか"""
+    if not isinstance(data, dict):
+        return False
+    total_score = data.get('total_score', 0)
+    if not isinstance(total_score, int) or isinstance(total_score, bool):
+        return False
+    if not isinstance(data.get('player_name', ''), str):
+        return False
+    if not isinstance(data.get('game_mode', 'Normal'), (str, int)):
+        return False
+    if not isinstance(data.get('scores', []), list):
+        return False
+    return isinstance(data.get('client_id', ''), str)
+
+def invalid_scores(entries):
+    """登録できないスコアの位置のリストを返す"""
+    return [i for i, data in enumerate(entries) if not is_valid_score(data)]
+
+def add_scores(entries):
+    """新しいスコアをまとめてデータベースに追加し、1件ごとにスコアのデータ（idつき）を返す
+
+    entriesは送信されたデータ（player_name, total_score, game_mode, scores, client_id）のリストで、
+    invalid_scores()で確認済みのもの。client_idが登録済みのスコアは追加せず、登録済みのデータを返す。
+    """
+    added = store.add_many([(data.get('player_name', '名無し'),
+                             data.get('total_score', 0),
+                             mode_display(data.get('game_mode', 'Normal')),
+                             data.get('scores', []),
+                             None,
+                             data.get('client_id'))
+                            for data in entries])
+    ranking_index.invalidate()
+    ranking_cache.invalidate()
+    return added
 
 @app.route('/')
 def index():
     """メインページ"""
-    ranking = load_ranking()
-    return render_template('index.html', ranking=ranking)
+    global index_page
+    ranking, _, etag = ranking_cache.get()
+    if index_page[0] != etag:
+        index_page = (etag, render_template('index.html', ranking=ranking))
+    return cached_response(index_page[1], etag, 'text/html')
 
 @app.route('/submit_score', methods=['POST'])
 def submit_score():
@@ -62,27 +124,112 @@ def submit_score():
         data = request.get_json()
         if not data:
             return jsonify({'success': False, 'message': 'データがありません'}), 400
+        if not is_valid_score(data):
+            return jsonify({'success': False, 'message': 'スコアのデータが正しくありません'}), 400
         
-        player_name = data.get('player_name', '名無し')
-        total_score = data.get('total_score', 0)
-        game_mode = data.get('game_mode', 'Normal')
-        scores = data.get('scores', [])
-        
-        ranking = add_score(player_name, total_score, game_mode, scores)
+        added = add_scores([data])[0]
         
         return jsonify({
             'success': True,
             'message': 'スコアが登録されました！',
-            'ranking': ranking[:10]  # 上位10件を返す
+            'id': added['id'],
+            'rank': ranking_index.rank_of_id(added['id']),  # 全体での順位
+            'ranking': ranking_cache.get()[0][:10]  # 上位10件を返す
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'エラーが発生しました: {str(e)}'}), 500
+
+@app.route('/submit_scores', methods=['POST'])
+def submit_scores():
+    """複数のスコアをまとめて送信するAPI（ゲームの送信キューから使う）"""
+    try:
+        data = request.get_json()
+        if not isinstance(data, dict) or not isinstance(data.get('scores'), list):
+            return jsonify({'success': False, 'message': 'データがありません'}), 400
+        # 正しくないスコアがあれば1件も登録せず、その位置を返す（送信側はそれだけを除いて再送する）
+        invalid = invalid_scores(data['scores'])
+        if invalid:
+            return jsonify({'success': False, 'message': 'スコアのデータが正しくありません',
+                            'invalid': invalid}), 400
+
+        add_scores(data['scores'])
+
+        return jsonify({
+            'success': True,
+            'message': f"{len(data['scores'])}件のスコアが登録されました！",
+            'ranking': ranking_cache.get()[0][:10]
         })
     except Exception as e:
         return jsonify({'success': False, 'message': f'エラーが発生しました: {str(e)}'}), 500
 
 @app.route('/ranking')
 def ranking_api():
-    """ランキングデータを取得するAPI"""
-    ranking = load_ranking()
-    return jsonify(ranking)
+    """ランキングデータを取得するAPI
+
+    ?mode=Hard（Normal, ふつう, むずかしい）でモード別、?date=2025-08-07（todayで今日）で日付別、
+    ?offset=&limit= でページを指定する。各スコアのrankは絞り込んだ中での順位。
+    絞り込んだ件数はX-Total-Countヘッダーで返す。
+    """
+    try:
+        key = ranking_key(request.args)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'modeかdateの指定が正しくありません'}), 400
+    _, body, etag = ranking_cache.get(key)
+    response = cached_response(body, etag, 'application/json')
+    response.headers['X-Total-Count'] = str(ranking_index.count(key[0], key[1]))
+    return response
+
+def lookup_rank(args):
+    """/ranking/rankのクエリから順位を求める。見つからなければNone
+
+    id・scoreが整数でないか、どちらもなければValueError（またはKeyError）。
+    """
+    mode, day = parse_mode(args.get('mode')), parse_day(args.get('date'))
+    if 'id' in args:
+        rank = ranking_index.rank_of_id(int(args['id']), mode, day)
+    else:
+        rank = ranking_index.rank_of_score(int(args['score']), mode, day)
+    if rank is None:
+        return None
+    return {'rank': rank, 'total': ranking_index.count(mode, day)}
+
+@app.route('/ranking/rank')
+def rank_api():
+    """順位を調べるAPI（?id=スコアのid で登録済みのスコア、?score=点数 でその点数の順位）
+
+    mode, dateで/rankingと同じように絞り込める。
+    """
+    try:
+        result = lookup_rank(request.args)
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'idかscore（整数）とmode・dateを正しく指定してください'}), 400
+    if result is None:
+        return jsonify({'success': False, 'message': 'スコアが見つかりません'}), 404
+    return jsonify(dict(result, success=True))
+
+@app.route('/ranking/stream')
+def ranking_stream():
+    """ランキングが更新されるたびに送るServer-Sent Eventsのエンドポイント（クエリは/rankingと同じ）"""
+    try:
+        key = ranking_key(request.args)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'modeかdateの指定が正しくありません'}), 400
+
+    def events():
+        version = ranking_cache.version
+        while True:
+            _, body, etag = ranking_cache.get(key)
+            yield f"id: {etag}\ndata: {body.decode('utf-8')}\n\n"
+            # 更新を待つ。更新がなければ接続維持のコメントだけ送る
+            while True:
+                new_version = ranking_cache.wait_for_update(version, timeout=SSE_KEEPALIVE)
+                if new_version != version:
+                    version = new_version
+                    break
+                yield ': keepalive\n\n'
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000, use_reloader=False) 
\ No newline at end of file
@@ -0,0 +1,247 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from quart import Quart, Response, render_template, request, jsonify
+from web_server import (ranking_cache, ranking_index, add_scores, is_valid_score, invalid_scores,
+                        ranking_key, lookup_rank, SSE_KEEPALIVE)
+
+# 本番用のASGIサーバー（複数のブースから同時にスコアが届くとき用。開発中はweb_server.pyでよい）
+# ルートはweb_server.pyと同じ。データベースとランキングのキャッシュもweb_server.pyのものを使う。
+# キャッシュをプロセス内に持つので、1プロセスで動かし、データベースの読み書きはスレッドで行う。
+app = Quart(__name__)
+
+READ_WORKERS = 8  # ランキングを読むスレッドの数
+WRITE_BATCH_SIZE = 200  # 1回のトランザクションでまとめて書き込むスコアの最大件数
+
+read_pool = ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix='ranking-read')
+
+index_page = (None, '')  # 描画済みのメインページ (ETag, HTML)
+
+
+class ScoreWriter:
+    """スコアの書き込みを1つのタスクに集め、まとめて1回のトランザクションで書き込む
+
+    書き込み中に届いたスコアは次の書き込みにまとめるので、混んでいるほど
+    1件あたりのコミットの回数が減る。書き込みは専用の1スレッドで行う。
+    """
+    def __init__(self, write, batch_size=WRITE_BATCH_SIZE):
+        self.write = write
+        self.batch_size = batch_size
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='score-write')
+        self.updated = None
+        self.queue = None
+        self.task = None
+
+    def start(self):
+        """イベントループの中で呼ぶ"""
+        self.updated = asyncio.Condition()
+        self.queue = asyncio.Queue()
+        self.task = asyncio.create_task(self._run())
+
+    async def submit(self, entries):
+        """スコアのリストを書き込み、書き込みが終わるまで待って追加したスコアのデータを返す"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((entries, future))
+        return await future
+
+    async def wait_for_update(self, version, timeout):
+        """ランキングの版がversionから進むまで待ち、新しい版を返す（timeoutで諦めたら同じ版）"""
+        async with self.updated:
+            try:
+                await asyncio.wait_for(self.updated.wait_for(lambda: ranking_cache.version != version), timeout)
+            except asyncio.TimeoutError:
+                pass
+            return ranking_cache.version
+
+    async def close(self):
+        """残っているスコアを書き込んでから止める"""
+        await self.queue.put(None)
+        await self.task
+        self.pool.shutdown()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stop = False
+        while not stop:
+            item = await self.queue.get()
+            if item is None:
+                return
+            # 書き込みを待つ間に届いた送信を、batch_size件までまとめる
+            batch = [item]
+            count = len(item[0])
+            while count < self.batch_size and not self.queue.empty():
+                item = self.queue.get_nowait()
+                if item is None:
+                    stop = True  # close()が呼ばれた。ここまでの分を書いて止める
+                    break
+                batch.append(item)
+                count += len(item[0])
+
+            try:
+                added = await loop.run_in_executor(self.pool, self.write, [e for entries, _ in batch for e in entries])
+                # 書き込んだ結果を送信ごとに分けて返す
+                start = 0
+                for entries, future in batch:
+                    future.set_result(added[start:start + len(entries)])
+                    start += len(entries)
+            except Exception:
+                # まとめて書けなかったら1件ずつ書き、失敗した送信だけエラーにする
+                for entries, future in batch:
+                    try:
+                        future.set_result(await loop.run_in_executor(self.pool, self.write, entries))
+                    except Exception as e:
+                        future.set_exception(e)
+            async with self.updated:
+                self.updated.notify_all()
+
+
+writer = ScoreWriter(add_scores)
+
+@app.before_serving
+async def start_writer():
+    writer.start()
+
+@app.after_serving
+async def stop_writer():
+    await writer.close()
+
+async def read(func, *args):
+    """データベースを読む処理をスレッドで行う（イベントループを止めない）"""
+    return await asyncio.get_running_loop().run_in_executor(read_pool, func, *args)
+
+async def get_ranking(key=None):
+    """ランキングの (データ, JSONのバイト列, ETag) を返す（作り直すときはスレッドで読む）"""
+    return await read(ranking_cache.get, key)
+
+def cached_response(body, etag, mimetype):
+    """キャッシュした内容を返す。ブラウザの持つ版と同じなら304を返す
+
+    web_server.pyのmake_conditional()と同じく、If-None-Matchがあれば
+    ETagで、なければIf-Modified-Sinceで判断する。
+    """
+    # HTTPの日付は秒単位なので、比べる前に秒未満を切り捨てる
+    last_modified = datetime.fromtimestamp(ranking_cache.last_modified, timezone.utc).replace(microsecond=0)
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains(etag)
+    else:
+        since = request.if_modified_since
+        not_modified = since is not None and last_modified <= since
+    if not_modified:
+        response = Response(b'', status=304)
+    else:
+        response = Response(body, mimetype=mimetype)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.no_cache = True  # 毎回ETagで確認させる
+    return response
+
+@app.route('/')
+async def index():
+    """メインページ"""
+    global index_page
+    ranking, _, etag = await get_ranking()
+    if index_page[0] != etag:
+        index_page = (etag, await render_template('index.html', ranking=ranking))
+    return cached_response(index_page[1], etag, 'text/html')
+
+@app.route('/submit_score', methods=['POST'])
+async def submit_score():
+    """スコアを送信するAPI"""
+    try:
+        data = await request.get_json()
+        if not data:
+            return jsonify({'success': False, 'message': 'データがありません'}), 400
+        if not is_valid_score(data):
+            return jsonify({'success': False, 'message': 'スコアのデータが正しくありません'}), 400
+
+        added = (await writer.submit([data]))[0]
+
+        return jsonify({
+            'success': True,
+            'message': 'スコアが登録されました！',
+            'id': added['id'],
+            'rank': await read(ranking_index.rank_of_id, added['id']),  # 全体での順位
+            'ranking': (await get_ranking())[0][:10]  # 上位10件を返す
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'エラーが発生しました: {str(e)}'}), 500
+
+@app.route('/submit_scores', methods=['POST'])
+async def submit_scores():
+    """複数のスコアをまとめて送信するAPI（ゲームの送信キューから使う）"""
+    try:
+        data = await request.get_json()
+        if not isinstance(data, dict) or not isinstance(data.get('scores'), list):
+            return jsonify({'success': False, 'message': 'データがありません'}), 400
+        invalid = invalid_scores(data['scores'])
+        if invalid:
+            return jsonify({'success': False, 'message': 'スコアのデータが正しくありません',
+                            'invalid': invalid}), 400
+
+        await writer.submit(data['scores'])
+
+        return jsonify({
+            'success': True,
+            'message': f"{len(data['scores'])}件のスコアが登録されました！",
+            'ranking': (await get_ranking())[0][:10]
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'エラーが発生しました: {str(e)}'}), 500
+
+@app.route('/ranking')
+async def ranking_api():
+    """ランキングデータを取得するAPI（クエリはweb_server.pyの/rankingと同じ）"""
+    try:
+        key = ranking_key(request.args)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'modeかdateの指定が正しくありません'}), 400
+    _, body, etag = await get_ranking(key)
+    response = cached_response(body, etag, 'application/json')
+    response.headers['X-Total-Count'] = str(await read(ranking_index.count, key[0], key[1]))
+    return response
+
+@app.route('/ranking/rank')
+async def rank_api():
+    """順位を調べるAPI（クエリはweb_server.pyの/ranking/rankと同じ）"""
+    try:
+        result = await read(lookup_rank, request.args)
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'idかscore（整数）とmode・dateを正しく指定してください'}), 400
+    if result is None:
+        return jsonify({'success': False, 'message': 'スコアが見つかりません'}), 404
+    return jsonify(dict(result, success=True))
+
+@app.route('/ranking/stream')
+async def ranking_stream():
+    """ランキングが更新されるたびに送るServer-Sent Eventsのエンドポイント"""
+    try:
+        key = ranking_key(request.args)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'modeかdateの指定が正しくありません'}), 400
+
+    async def events():
+        version = ranking_cache.version
+        while True:
+            _, body, etag = await get_ranking(key)
+            yield f"id: {etag}\ndata: {body.decode('utf-8')}\n\n".encode('utf-8')
+            # 更新を待つ。更新がなければ接続維持のコメントだけ送る
+            while True:
+                new_version = await writer.wait_for_update(version, SSE_KEEPALIVE)
+                if new_version != version:
+                    version = new_version
+                    break
+                yield b': keepalive\n\n'
+
+    response = Response(events(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.timeout = None  # 接続を切らずに送り続ける
+    return response
+
+if __name__ == '__main__':
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    config = Config()
+    config.bind = ['0.0.0.0:5000']
+    config.keep_alive_timeout = 30  # ブースのゲームは同じ接続を使い回して送信する
+    asyncio.run(serve(app, config))
@@ -2,6 +2,7 @@ import pygame
 import pymunk
 import numpy as np
 import cv2
+from rotation_cache import rotation_cache
 
 def create_transparent_surface(rgb, mask, scale=1.0):
     import cv2
@@ -37,9 +38,8 @@ class Animal:
         self.y = y
         self.scale = scale
         
-        # 回転キャッシュ（パフォーマンス向上）
-        self._rotation_cache = {}
-        self._cache_size_limit = 360
+        # 回転した画像は全ての動物で共有するrotation_cacheに持つ
+        self._zoom_image = (1, None)  # (倍率, その倍率に拡大縮小した画像)
 
 
 
@@ -139,31 +139,37 @@ class Animal:
 
 
 
-    def draw(self, screen):
+    def scaled_image(self, zoom):
+        """zoom倍に拡大縮小した画像（倍率が変わったときだけ作り直す）
+
+        画面と同じピクセル形式にしておくので、回転した画像もそのまま速く転送できる。
+        """
+        if self._zoom_image[0] != zoom or self._zoom_image[1] is None:
+            if zoom == 1:
+                image = self.image
+            else:
+                width, height = self.image.get_size()
+                size = (max(1, round(width * zoom)), max(1, round(height * zoom)))
+                image = pygame.transform.smoothscale(self.image, size)
+            self._zoom_image = (zoom, image.convert_alpha())
+        return self._zoom_image[1]
+
+    def draw(self, screen, view=None):
+        """画面に描く（viewを渡すとそのカメラの位置と倍率で描く）"""
         x, y = self.body.position
         angle = -self.body.angle * 57.2958  # pymunkは反時計回り → 度に変換
 
         if self.image:
-            offset = pygame.Vector2(self.center_x, self.center_y)
-
-            # 回転キャッシュを使用（パフォーマンス向上）
-            angle_rounded = round(angle)
-            
-            if angle_rounded not in self._rotation_cache:
-                # キャッシュサイズを制限
-                if len(self._rotation_cache) >= self._cache_size_limit:
-                    # 最も古いキャッシュを削除（LRU方式）
-                    oldest_key = min(self._rotation_cache.keys())
-                    del self._rotation_cache[oldest_key]
-                
-                # 高品質な回転処理
-                rotated_image = pygame.transform.rotate(self.image, angle_rounded)
-                # 回転後の画像を最適化
-                rotated_image = rotated_image.convert_alpha()
-                self._rotation_cache[angle_rounded] = rotated_image
-            
-            rotated_image = self._rotation_cache[angle_rounded]
-            image_rect = self.image.get_rect()
+            zoom = view.zoom if view else 1
+            if view:
+                x, y = view.to_screen(x, y)
+            image = self.scaled_image(zoom)
+            offset = pygame.Vector2(self.center_x, self.center_y) * zoom
+
+            # 回転キャッシュを使用（角度は丸める）。揺れ始めたときのために前後の角度も用意しておく
+            rotated_image, angle_rounded = rotation_cache.get(image, angle)
+            rotation_cache.prewarm(image, angle_rounded)
+            image_rect = image.get_rect()
             rotated_rect = rotated_image.get_rect()
 
             # 画像中心に対する相対オフセット（回転前）
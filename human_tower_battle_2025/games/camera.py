@@ -0,0 +1,65 @@
+import threading
+import time
+import cv2
+import numpy as np
+import pygame
+
+class CameraStream:
+    """カメラの読み込みを別スレッドで行い、最新のフレームだけを持つ
+
+    ゲームのループはカメラを待たずに、最後に届いたフレームを表示する。
+    プレビュー用の縮小・色変換・反転は読み込みスレッドで前もって確保した配列に行い、
+    update()で表示用の配列に写す。表示用のSurfaceはその配列を直接参照している
+    （pygame.image.frombuffer）ので、フレームごとにSurfaceを作らない。
+    """
+    def __init__(self, cap, preview_size=(640, 480)):
+        self.cap = cap
+        self.preview_size = preview_size
+        width, height = preview_size
+        self._back = np.empty((height, width, 3), dtype=np.uint8)  # 読み込みスレッドが書く
+        self._resized = np.empty((height, width, 3), dtype=np.uint8)
+        self._front = np.empty((height, width, 3), dtype=np.uint8)  # surfaceが参照する
+        self.surface = pygame.image.frombuffer(self._front, preview_size, "RGB")
+        self._frame = None  # 最新のフレーム（元の解像度、BGR）
+        self._frame_count = 0  # 読み込んだフレームの数
+        self._shown_count = 0  # surfaceに写したフレームの数
+        self.failed = False  # カメラから画像が取得できなくなったらTrue
+        self._lock = threading.Lock()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        width, height = self.preview_size
+        while self._running:
+            ret, frame = self.cap.read()  # 次のフレームが来るまで待つ（ゲームのループは待たない）
+            if not ret:
+                self.failed = True
+                time.sleep(0.1)  # カメラが戻るまで間をあけて試す
+                continue
+            # プレビュー用：縮小してRGBにし、水平反転（鏡像）して中央に赤い点を描く
+            cv2.resize(frame, self.preview_size, dst=self._resized)
+            cv2.cvtColor(self._resized, cv2.COLOR_BGR2RGB, dst=self._resized)
+            with self._lock:
+                cv2.flip(self._resized, 1, dst=self._back)  # 1 = 水平反転
+                cv2.circle(self._back, (width // 2, height // 2), 8, (255, 0, 0), -1)
+                self._frame = frame
+                self._frame_count += 1
+                self.failed = False
+
+    def update(self):
+        """新しいフレームが届いていればsurfaceに写す。表示できるフレームがあればTrue"""
+        with self._lock:
+            if self._frame_count != self._shown_count:
+                np.copyto(self._front, self._back)
+                self._shown_count = self._frame_count
+        return self._shown_count > 0 and not self.failed
+
+    def latest_frame(self):
+        """最新のフレーム（元の解像度、BGR）を返す。まだなければNone"""
+        with self._lock:
+            return None if self._frame is None else self._frame.copy()
+
+    def stop(self):
+        self._running = False
+        self._thread.join(timeout=1)
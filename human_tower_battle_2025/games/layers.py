@@ -0,0 +1,119 @@
+from collections import OrderedDict
+import pygame
+
+MAX_BACKGROUNDS = 2  # 保持する背景画像の数（ウィンドウ全体の画像は1枚で数MBになる）
+_backgrounds = OrderedDict()  # (パス, サイズ) -> 拡大縮小した背景画像
+
+def get_background(size, path="Background.png", cache=True):
+    """背景画像をsizeに拡大縮小して返す（読み込みと拡大縮小はサイズごとに1回だけ）
+
+    最近使ったMAX_BACKGROUNDS個だけを保持する。一度しか使わないもの（合成して
+    別に保持する場合）はcache=Falseにする。背景画像が見つからない場合はNoneを返す。
+    """
+    key = (path, tuple(size))
+    if key in _backgrounds:
+        _backgrounds.move_to_end(key)
+        return _backgrounds[key]
+    try:
+        image = pygame.image.load(path)
+    except (pygame.error, FileNotFoundError):
+        background = None
+    else:
+        # 画面と同じピクセル形式にしておくと転送が速い
+        background = pygame.transform.scale(image, size).convert()
+    if cache:
+        _backgrounds[key] = background
+        if len(_backgrounds) > MAX_BACKGROUNDS:
+            _backgrounds.popitem(last=False)
+    return background
+
+def clear_backgrounds():
+    """ウィンドウサイズの変更時に、前のサイズの背景画像を破棄する"""
+    _backgrounds.clear()
+
+
+class Viewport:
+    """ワールド座標（物理演算の座標。BASEサイズ）を画面の座標に変換するカメラ
+
+    ワールドの幅がウィンドウの幅にちょうど収まる倍率（zoom）で描き、縦は画面に入る分だけ
+    表示する。topは画面の上端にあたるワールドのy座標で、follow()で積み上がった動物の
+    上端を追いかける（地面より下にはいかない。ワールドの上端より上にはいける）。
+    """
+    def __init__(self, world_size, window_size):
+        self.world_width, self.world_height = world_size
+        self.resize(window_size)
+
+    def resize(self, window_size):
+        self.window_size = tuple(window_size)
+        window_width, window_height = self.window_size
+        self.zoom = window_width / self.world_width
+        # 地面が画面の下端にくるときのtop（ウィンドウが縦長なら負になる）
+        self.ground_top = self.world_height - window_height / self.zoom
+        self.top = self.ground_top
+
+    def follow(self, target_y, margin=300, smoothing=0.1):
+        """ワールドのtarget_yより上margin分まで画面に入るようにtopを少しずつ近づける"""
+        goal = min(self.ground_top, target_y - margin)
+        self.top += (goal - self.top) * smoothing
+
+    def to_screen(self, x, y):
+        """ワールドの座標を画面の座標にする"""
+        return x * self.zoom, (y - self.top) * self.zoom
+
+    def length(self, value):
+        """ワールドの長さを画面の長さ（1ピクセル以上）にする"""
+        return max(1, round(value * self.zoom))
+
+
+class LayeredRenderer:
+    """動かない層（背景・地面の線・台）をウィンドウの解像度で一度だけ合成しておき、
+    毎フレームそれをカメラの位置に合わせて画面に転送する
+
+    合成し直すのはウィンドウのサイズが変わったときだけ。ワールドの上端より上が
+    見えているときは背景の一番上の色で塗る。
+    """
+    def __init__(self, platform_rect):
+        self.platform_rect = platform_rect
+        self.static_layer = None
+        self.sky_color = (255, 255, 255)
+        self._layer_key = None
+
+    def _build_static_layer(self, view):
+        world_height = view.world_height
+        width = view.window_size[0]
+        layer = pygame.Surface((width, view.length(world_height))).convert()
+        background = get_background(layer.get_size(), cache=False)  # 合成した層だけを保持する
+        if background:
+            layer.blit(background, (0, 0))
+        else:
+            # 背景画像が見つからない場合は白で塗りつぶす
+            layer.fill((255, 255, 255))
+        self.sky_color = layer.get_at((0, 0))
+
+        # 地面の線を描画（層の上端がワールドのy=0）
+        ground_y = round((world_height - 10) * view.zoom)
+        pygame.draw.line(layer, (255, 0, 0), (0, ground_y), (width, ground_y), view.length(5))
+
+        # 台を描画
+        platform_rect = self.platform_rect
+        pygame.draw.rect(
+            layer,
+            (100, 100, 100),
+            pygame.Rect(
+                round(platform_rect["x1"] * view.zoom),
+                round((platform_rect["y"] - 25) * view.zoom),  # platform_height/2 = 50/2 = 25
+                view.length(platform_rect["x2"] - platform_rect["x1"]),
+                view.length(50)  # platform_heightに合わせる
+            )
+        )
+        return layer
+
+    def draw_static(self, screen, view):
+        """動かない層を画面に描く"""
+        if self._layer_key != view.window_size:
+            self.static_layer = self._build_static_layer(view)
+            self._layer_key = view.window_size
+        layer_y = round(-view.top * view.zoom)
+        if layer_y > 0:
+            screen.fill(self.sky_color, (0, 0, view.window_size[0], layer_y))
+        screen.blit(self.static_layer, (0, layer_y))
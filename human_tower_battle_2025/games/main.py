@@ -1,13 +1,18 @@
 import pygame
 import os
+import time
 import numpy as np
 from animal import Animal
 from game import create_space
-from photo import capture_and_segment, capture_from_existing_camera
+from photo import SegmentationWorker
 from sam2.build_sam import build_sam2
 from sam2.sam2_image_predictor import SAM2ImagePredictor
 from screens import StartScreen, GameOverScreen
 from ranking import RankingManager
+from camera import CameraStream
+from layers import LayeredRenderer, Viewport, clear_backgrounds
+from text_cache import text_cache
+from rotation_cache import rotation_cache
 import cv2
 
 # ウィンドウを外部モニターに配置（pygame.init()の前に設定）
@@ -37,6 +42,11 @@ space, platform_rect = create_space(BASE_WIDTH, BASE_HEIGHT)
 config_path = "../sam2/configs/sam2.1/sam2.1_hiera_l.yaml"
 ckpt_path = "../sam2/checkpoints/sam2.1_hiera_large.pt"
 predictor = SAM2ImagePredictor(build_sam2(config_path, ckpt_path, device="cpu"))
+# 切り抜きは別スレッドで行い、その間も物理演算とプレビューを動かし続ける
+segmenter = SegmentationWorker(predictor)
+
+# 背景・地面の線・台はウィンドウの解像度で一度だけ合成しておき、毎フレームはその上に描く
+renderer = LayeredRenderer(platform_rect)
 
 # ゲーム状態の初期化
 animal_ingame = []
@@ -49,24 +59,28 @@ game_state = "start"  # "start", "playing", "game_over"
 ranking_manager = RankingManager()
 
 # 画面の初期化
-start_screen = StartScreen(BASE_WIDTH, BASE_HEIGHT)
+start_screen = StartScreen(BASE_WIDTH, BASE_HEIGHT, ranking_manager)
 game_over_screen = None
 
 # カメラプレビュー用の変数
 camera_cap = None
-preview_surface = None
+camera = None  # カメラを読み込むスレッド（最新のフレームだけを持つ）
+preview_surface = None  # プレビューを画面の倍率に合わせて縮小する先
 
 # 初期ウィンドウサイズ
 window_width, window_height = BASE_WIDTH, BASE_HEIGHT
 
+# ワールド（BASEサイズ）をウィンドウの解像度で描くためのカメラ（タワーの上端を追いかける）
+view = Viewport((BASE_WIDTH, BASE_HEIGHT), (window_width, window_height))
+
 
 
 # プリセット位置の矢印を描画する関数
-def draw_preset_arrows(surface, platform_rect):
-    """プリセット位置を示す矢印を描画"""
+def draw_preset_arrows(surface, platform_rect, view):
+    """プリセット位置を示す矢印を描画（位置はワールド座標で決めてviewで画面に変換）"""
     # 矢印の色とサイズ
     arrow_color = (255, 255, 0)  # 黄色
-    arrow_size = 60  # 矢印サイズを大きく
+    arrow_size = view.length(60)  # 矢印サイズを大きく
     
     # 3つのプリセット位置
     positions = [
@@ -77,7 +91,7 @@ def draw_preset_arrows(surface, platform_rect):
     
     for x, key_num in positions:
         # 矢印の位置（動物の上に表示）
-        arrow_y = platform_rect["y"] - 250  # 動物の上に表示（少し上に）
+        x, arrow_y = view.to_screen(x, platform_rect["y"] - 250)  # 動物の上に表示（少し上に）
         
         # 矢印を描画（下向きの三角形）
         arrow_points = [
@@ -88,54 +102,67 @@ def draw_preset_arrows(surface, platform_rect):
         pygame.draw.polygon(surface, arrow_color, arrow_points)
         
         # キー番号を表示（大きく）
-        try:
-            font = pygame.font.Font("/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc", 48)
-        except:
-            try:
-                font = pygame.font.Font("/System/Library/Fonts/Arial Unicode MS.ttf", 48)
-            except:
-                font = pygame.font.Font(None, 48)
-        
-        key_text = font.render(key_num, True, (255, 255, 255))
+        key_text = text_cache.render(key_num, view.length(48), (255, 255, 255))
         key_rect = key_text.get_rect()
-        key_rect.center = (x, arrow_y + arrow_size + 30)
+        key_rect.center = (x, arrow_y + arrow_size + view.length(30))
         surface.blit(key_text, key_rect)
         
         # 矢印の枠線を描画（太く）
-        pygame.draw.polygon(surface, (0, 0, 0), arrow_points, 4)
+        pygame.draw.polygon(surface, (0, 0, 0), arrow_points, view.length(4))
+
+# 切り抜いた画像から動物を生成する関数
+def spawn_animal(rgb, mask):
+    global current_animal, number
+    # 現在の動物の最大高さを取得
+    max_y = 50  # デフォルトの高さ
+    if animal_ingame:
+        max_y = min([animal.body.position.y for animal in animal_ingame])
+        # 最大高さから800ピクセル上に配置（より上に移動）
+        spawn_y = max_y - 800
+    else:
+        # 最初の動物は台の上に配置（より上に移動）
+        spawn_y = platform_rect["y"] - 800
+
+    current_animal = Animal(space, BASE_WIDTH // 2, spawn_y,
+                            rgb=rgb, mask=mask, scale=0.6)
+    print("A")
+    animal_ingame.append(current_animal)
+    number += 1
+
+# 切り抜き中の表示
+def draw_segmenting(surface, view):
+    text = text_cache.render("きりぬき中…（スペースキーでとりなおし）", view.length(64), (255, 255, 255))
+    text_rect = text.get_rect()
+    text_rect.center = (surface.get_width() // 2, view.length(700))
+    pygame.draw.rect(surface, (0, 0, 0), text_rect.inflate(view.length(40), view.length(20)))
+    surface.blit(text, text_rect)
 
 # ランキング表示関数
-def draw_rankings(surface, ranking_manager):
-    """ランキングを描画"""
+def draw_rankings(surface, ranking_manager, view):
+    """ランキングを描画（画面に固定。大きさだけviewの倍率に合わせる）"""
     # 本日のランキングを取得
     daily_rankings = ranking_manager.get_daily_rankings()
     
-    # フォント設定（大きなフォント）
-    try:
-        font = pygame.font.Font("/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc", 64)  # フォントサイズを大きく
-    except:
-        try:
-            font = pygame.font.Font("/System/Library/Fonts/Arial Unicode MS.ttf", 64)  # フォントサイズを大きく
-        except:
-            font = pygame.font.Font(None, 64)  # フォントサイズを大きく
+    # フォントサイズ（大きなフォント）
+    font_size = view.length(64)
     
     # プレビューカメラの位置を考慮してランキングを表示（左側に配置）
     # プレビューカメラは右上にあるので、左上にランキングを表示
-    ranking_x = 80  # 右側に移動
-    ranking_y = 50
+    ranking_x = view.length(80)  # 右側に移動
+    ranking_y = view.length(50)
     
     # 1位のみ表示
     if daily_rankings:
         top_score = daily_rankings[0]
         rank_text = f"今日の1位：{top_score['score']}人"
-        rank_surface = font.render(rank_text, True, (255, 215, 0))  # 金色
+        rank_surface = text_cache.render(rank_text, font_size, (255, 215, 0))  # 金色
         rank_rect = rank_surface.get_rect()
         rank_rect.topleft = (ranking_x, ranking_y)  # 1行で表示
         surface.blit(rank_surface, rank_rect)
     else:
-        no_data_text = font.render("まだきろくがありません", True, (255, 215, 0))  # 金色
+        no_data_text = text_cache.render("まだきろくがありません", font_size, (255, 215, 0))  # 金色
         no_data_rect = no_data_text.get_rect()
-        no_data_rect.topleft = (ranking_x, ranking_y + 60)  # 間隔を広げる
+        no_data_rect.topleft = (ranking_x, ranking_y + view.length(60))  # 間隔を広げる
         surface.blit(no_data_text, no_data_rect)
 
 # カメラプレビューを初期化
@@ -160,11 +187,14 @@ def init_camera_preview():
     return False
 
 # カメラプレビューを初期化
-init_camera_preview()
+if init_camera_preview():
+    camera = CameraStream(camera_cap)
 
 # メインループ
 while running:
+    frame_start = time.perf_counter()
     dt = 1 / 120.0  # 物理演算の精度を上げるためにタイムステップを小さく  
+    ranking_manager.sync_if_due()  # 記録したスコアをまとめてディスクに書き込む
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
@@ -173,21 +203,17 @@ while running:
         elif event.type == pygame.VIDEORESIZE:
             window_width, window_height = event.w, event.h
             screen = pygame.display.set_mode((window_width, window_height), pygame.RESIZABLE)
-            
-            # ウィンドウサイズが変更された時に重力を再計算
-            # 新しい重力を計算（重力を下げる）
-            base_width, base_height = 1440, 2489
-            base_gravity = 1500
-            gravity_scale = window_height / base_height
-            gravity_y = base_gravity * gravity_scale
-            space.gravity = (0, gravity_y)
+            text_cache.clear()  # 描画済みの文字列はサイズが変わるので破棄
+            # 物理演算はワールド座標のままなので、描画の倍率だけを変える（動かない層は次の描画で作り直す）
+            view.resize((window_width, window_height))
+            rotation_cache.clear()  # 前の倍率で回転した画像はもう使わない
+            clear_backgrounds()  # 前のサイズの背景画像も残さない
             
             # 画面オブジェクトを新しいサイズで再作成
-            start_screen = StartScreen(window_width, window_height)
+            start_screen = StartScreen(window_width, window_height, ranking_manager)
             if game_over_screen:
-                game_over_screen = GameOverScreen(window_width, window_height, number)
-            
-            print(f"ウィンドウサイズ変更: 重力加速度: (0, {gravity_y:.1f}) - ウィンドウサイズ: {window_width}x{window_height}")
+                game_over_screen = GameOverScreen(window_width, window_height, number, ranking_manager,
+                                                  record_score=False)
 
         # ゲーム状態に応じてイベント処理
         if game_state == "start":
@@ -205,6 +231,8 @@ while running:
                     animal_ingame = []
                     current_animal = None
                     number = 0
+                    segmenter.cancel()
+                    rotation_cache.clear()  # 前のゲームの動物の画像を残さない
                     game_over_screen = None  # ゲームオーバー画面をクリア
                     game_state = "playing"
                     print("ゲームをリスタートしました")
@@ -213,25 +241,13 @@ while running:
         elif game_state == "playing":
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE and (not current_animal or current_animal.falling):
-                    # スペースキーで撮影して動物生成（既存のカメラから直接撮影）
-                    # 動物が落ちていない時は撮影できない
-                    rgb, mask = capture_from_existing_camera(camera_cap, predictor)
-                    
-                    # 現在の動物の最大高さを取得
-                    max_y = 50  # デフォルトの高さ
-                    if animal_ingame:
-                        max_y = min([animal.body.position.y for animal in animal_ingame])
-                        # 最大高さから800ピクセル上に配置（より上に移動）
-                        spawn_y = max_y - 800
+                    # スペースキーで撮影し、切り抜きを依頼する（既存のカメラから直接撮影）
+                    # 動物が落ちていない時は撮影できない。切り抜き中に押すと撮り直し
+                    frame = camera.latest_frame() if camera else None
+                    if frame is not None:
+                        segmenter.submit(frame)
                     else:
-                        # 最初の動物は台の上に配置（より上に移動）
-                        spawn_y = platform_rect["y"] - 800
-                    
-                    current_animal = Animal(space, BASE_WIDTH // 2, spawn_y,
-                                            rgb=rgb, mask=mask, scale=0.6)
-                    print("A")
-                    animal_ingame.append(current_animal)
-                    number += 1
+                        print("カメラから画像が取得できませんでした")
 
                 elif event.key == pygame.K_d and current_animal and not current_animal.falling:
                     # Dキーで現在の動物を破棄
@@ -256,6 +272,14 @@ while running:
                     current_animal.start_fall()
                     print("右端に配置して落下開始")
 
+    # 切り抜きが終わっていれば動物を生成
+    result = segmenter.poll()
+    if result and game_state == "playing":
+        rgb, mask = result
+        if rgb is not None:
+            print("撮影完了")
+            spawn_animal(rgb, mask)
+
     # ゲーム状態に応じて画面を描画
     if game_state == "start":
         start_screen.draw(screen)
@@ -269,111 +293,55 @@ while running:
             clock.tick(60)
             continue
     elif game_state == "playing":
-        # 仮描画サーフェス（BASEサイズ）
-        base_surface = pygame.Surface((BASE_WIDTH, BASE_HEIGHT))
-
-    # 背景画像を読み込んで表示
-    try:
-        background = pygame.image.load("Background.png")
-        background = pygame.transform.scale(background, (BASE_WIDTH, BASE_HEIGHT))
-        base_surface.blit(background, (0, 0))
-    except:
-        # 背景画像が見つからない場合は白で塗りつぶす
-        base_surface.fill((255, 255, 255))
-
-    # カメラプレビューを更新・表示
-    if camera_cap and camera_cap.isOpened():
-        ret, frame = camera_cap.read()
-        if ret:
-            # OpenCV画像（BGR）をRGBに変換
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # プレビューサイズを設定（画面の上部に表示）
-            preview_width = 640
-            preview_height = 480
-            
-            # フレームをリサイズ
-            frame_resized = cv2.resize(frame_rgb, (preview_width, preview_height))
-            
-            # 画像を水平反転（鏡像にする）
-            frame_resized = cv2.flip(frame_resized, 1)  # 1 = 水平反転
-            
-            # 中央に赤い点を描画
-            center_x = preview_width // 2
-            center_y = preview_height // 2
-            cv2.circle(frame_resized, (center_x, center_y), 8, (255, 0, 0), -1)  # 赤い円を描画
-            
-            # numpy配列をPygameのSurfaceに変換
-            preview_surface = pygame.surfarray.make_surface(frame_resized.swapaxes(0, 1))
-            
+        # カメラをタワーの一番上（次の動物が出る位置を含む）に近づける
+        if animal_ingame:
+            view.follow(min(animal.body.position.y for animal in animal_ingame))
+        else:
+            view.follow(BASE_HEIGHT)
+        # 背景・地面の線・台（ウィンドウの解像度で合成済み）
+        renderer.draw_static(screen, view)
+
+    # カメラプレビューを更新・表示（読み込みスレッドに新しいフレームが届いていれば写す）
+    if camera:
+        if camera.update():
+            preview_width, preview_height = (view.length(n) for n in camera.preview_size)
+            preview = camera.surface
+            if preview.get_size() != (preview_width, preview_height):
+                # 画面の倍率に合わせて縮小する（縮小先のSurfaceは使い回す）
+                if preview_surface is None or preview_surface.get_size() != (preview_width, preview_height):
+                    preview_surface = pygame.Surface((preview_width, preview_height), 0, camera.surface)
+                pygame.transform.scale(camera.surface, (preview_width, preview_height), preview_surface)
+                preview = preview_surface
+
             # プレビューを画面の右上に表示
-            preview_x = BASE_WIDTH - preview_width - 30
-            preview_y = 30
-            base_surface.blit(preview_surface, (preview_x, preview_y))
+            preview_x = window_width - preview_width - view.length(30)
+            preview_y = view.length(30)
+            screen.blit(preview, (preview_x, preview_y))
             
             # プレビュー枠を描画
-            pygame.draw.rect(base_surface, (255, 255, 255), 
+            pygame.draw.rect(screen, (255, 255, 255), 
                            (preview_x - 2, preview_y - 2, preview_width + 4, preview_height + 4), 2)
-            
-            # 撮影準備中の表示（macOS対応、大きなフォント）
-            try:
-                # macOS用の日本語フォント
-                font = pygame.font.Font("/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc", 32)
-            except:
-                try:
-                    # 代替フォント
-                    font = pygame.font.Font("/System/Library/Fonts/Arial Unicode MS.ttf", 32)
-                except:
-                    # デフォルトフォント
-                    font = pygame.font.Font(None, 32)
-            
-            # テキスト表示を削除（playing中は何も表示しない）
         else:
-            # カメラが利用できない場合のメッセージ（macOS対応、大きなフォント）
-            try:
-                # macOS用の日本語フォント
-                font = pygame.font.Font("/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc", 36)
-            except:
-                try:
-                    # 代替フォント
-                    font = pygame.font.Font("/System/Library/Fonts/Arial Unicode MS.ttf", 36)
-                except:
-                    # デフォルトフォント
-                    font = pygame.font.Font(None, 36)
-            text = font.render("カメラが利用できません", True, (255, 0, 0))
+            # カメラが利用できない場合のメッセージ（大きなフォント）
+            text = text_cache.render("カメラが利用できません", view.length(36), (255, 0, 0))
             text_rect = text.get_rect()
-            text_rect.center = (BASE_WIDTH // 2, 50)
-            base_surface.blit(text, text_rect)
-
-    # 地面の線を描画
-    pygame.draw.line(base_surface, (255, 0, 0), (0, BASE_HEIGHT - 10), (BASE_WIDTH, BASE_HEIGHT - 10), 5)
-
-    # 台を描画
-    pygame.draw.rect(
-        base_surface,
-        (100, 100, 100),
-        pygame.Rect(
-            platform_rect["x1"],
-            platform_rect["y"] - 25,  # platform_height/2 = 50/2 = 25
-            platform_rect["x2"] - platform_rect["x1"],
-            50  # platform_heightに合わせる
-        )
-    )
-
-    # 動物を描画（base_surface に対して）
+            text_rect.center = (window_width // 2, view.length(50))
+            screen.blit(text, text_rect)
+
+    # 動物を描画（ワールド座標からviewで画面の座標に変換して描く）
     for animal in animal_ingame:
-        animal.draw(base_surface)
+        animal.draw(screen, view)
 
     # プリセット位置の矢印を描画（現在の動物が存在し、落下していない場合のみ）
     if current_animal and not current_animal.falling:
-        draw_preset_arrows(base_surface, platform_rect)
+        draw_preset_arrows(screen, platform_rect, view)
 
     # ランキング表示
-    draw_rankings(base_surface, ranking_manager)
+    draw_rankings(screen, ranking_manager, view)
+
+    if segmenter.busy:
+        draw_segmenting(screen, view)
 
-    # base_surface をスケーリングして画面に描画
-    scaled_surface = pygame.transform.scale(base_surface, (window_width, window_height))
-    screen.blit(scaled_surface, (0, 0))
     pygame.display.flip()
 
     # 物理演算の更新（滑らかな動きのため複数回ステップ実行）
@@ -390,16 +358,25 @@ while running:
             # 落とした数-1を表示するため、numberを1減らす
             number = max(0, number - 1)
             game_state = "game_over"
+            segmenter.cancel()
             game_over_screen = GameOverScreen(window_width, window_height, number, ranking_manager)
             break
 
+    # フレームの余った時間で、揺れている動物の近くの角度を回転しておく
+    rotation_cache.warm(frame_start + 1 / 120 - time.perf_counter())
+
     # フレームレートを安定化（滑らかな動きのため）
     clock.tick(120)  # フレームレートを120FPSに上げて滑らかさを向上
 info = pygame.display.Info()
 
 # カメラをリリース
+if camera:
+    camera.stop()
 if camera_cap:
     camera_cap.release()
 
+ranking_manager.close()
+segmenter.stop()
+
 pygame.quit()
 
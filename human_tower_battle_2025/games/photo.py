@@ -1,3 +1,6 @@
+import os
+import queue
+import threading
 import cv2
 import torch
 import numpy as np
@@ -117,27 +120,22 @@ def capture_and_segment(predictor):
     return None, None
 
 
-def capture_from_existing_camera(camera_cap, predictor):
-    """既に開いているカメラから直接撮影してセグメンテーションを行う"""
-    if not camera_cap or not camera_cap.isOpened():
-        print("カメラが利用できません")
-        return None, None
-    
-    # 現在のフレームを取得
-    ret, frame = camera_cap.read()
-    if not ret:
-        print("カメラから画像が取得できませんでした")
-        return None, None
-    
+def segment_frame(frame, predictor, should_cancel=None):
+    """カメラの画像（BGR）の中央にある物体をSAM2で切り抜き、(画像, マスク) を返す
+
+    should_cancel()がTrueを返したら途中でやめて (None, None) を返す。
+    """
     height, width = frame.shape[:2]
     center = np.array([[width // 2, height // 2]])
     labels = np.array([1])
-    
+
     # セグメンテーション実行
     clean_frame = frame.copy()
     image = cv2.cvtColor(clean_frame, cv2.COLOR_BGR2RGB)
     predictor.set_image(image)
-    
+    if should_cancel and should_cancel():
+        return None, None
+
     with torch.inference_mode():
         masks, _, _ = predictor.predict(
             point_coords=center,
@@ -146,10 +144,92 @@ def capture_from_existing_camera(camera_cap, predictor):
             mask_input=None,
             multimask_output=True
         )
-    
+
     final_mask = np.zeros((height, width), dtype=np.uint8)
     for m in masks:
         final_mask = np.maximum(final_mask, (m > 0.0).astype(np.uint8))
+    return clean_frame, final_mask*255
+
+
+def capture_from_existing_camera(camera_cap, predictor):
+    """既に開いているカメラから直接撮影してセグメンテーションを行う"""
+    if not camera_cap or not camera_cap.isOpened():
+        print("カメラが利用できません")
+        return None, None
+    
+    # 現在のフレームを取得
+    ret, frame = camera_cap.read()
+    if not ret:
+        print("カメラから画像が取得できませんでした")
+        return None, None
     
+    rgb, mask = segment_frame(frame, predictor)
     print("撮影完了")
-    return clean_frame, final_mask*255
+    return rgb, mask
+
+
+class SegmentationWorker:
+    """SAM2のセグメンテーションを別スレッドで行う（ゲームのループを止めないため）
+
+    submit()で撮影した画像を渡し、毎フレームpoll()で結果を受け取る。撮り直しで
+    submit()やcancel()を呼ぶと、それまでの依頼の結果は捨てる（計算中のモデルは
+    止められないので、set_image()の後で打ち切るか結果を捨てる）。
+    PyTorchは計算中にGILを手放すので、その間もゲームのループは動き続ける。
+    """
+    def __init__(self, predictor, num_threads=None):
+        self.predictor = predictor
+        # ゲームのループ用にCPUを1つ空けておく
+        torch.set_num_threads(num_threads or max(1, (os.cpu_count() or 2) - 1))
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._latest_id = 0  # 最後に依頼した番号（これと違う依頼の結果は捨てる）
+        self._pending = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def busy(self):
+        """切り抜きを待っている依頼があればTrue"""
+        return self._pending
+
+    def submit(self, frame):
+        """撮影した画像（BGR）の切り抜きを依頼する。前の依頼は取り消す"""
+        self._latest_id += 1
+        self._pending = True
+        self._requests.put((self._latest_id, frame.copy()))
+
+    def cancel(self):
+        """依頼を取り消す"""
+        self._latest_id += 1
+        self._pending = False
+
+    def poll(self):
+        """最新の依頼の結果 (画像, マスク) を返す。まだなら None（失敗したら (None, None)）"""
+        while True:
+            try:
+                request_id, rgb, mask = self._results.get_nowait()
+            except queue.Empty:
+                return None
+            if request_id == self._latest_id and self._pending:
+                self._pending = False
+                return rgb, mask
+
+    def _run(self):
+        while True:
+            item = self._requests.get()
+            if item is None:
+                return
+            request_id, frame = item
+            if request_id != self._latest_id:
+                continue  # 取り消された依頼
+            try:
+                rgb, mask = segment_frame(frame, self.predictor,
+                                          should_cancel=lambda: request_id != self._latest_id)
+            except Exception as e:
+                print(f"切り抜きに失敗しました: {e}")
+                rgb, mask = None, None
+            self._results.put((request_id, rgb, mask))
+
+    def stop(self):
+        self._requests.put(None)
+        self._thread.join(timeout=1)
@@ -1,76 +1,83 @@
-import json
-import os
+from bisect import bisect_left, bisect_right
 from datetime import datetime
+from score_log import ScoreLog
 
 class RankingManager:
-    def __init__(self, filename="ranking.json"):
+    """スコアの全履歴を保持し、日ごと・全体のランキングをスコアの高い順に並べて持つ
+
+    並びは負のスコアのリストに二分探索で挿入して保つので、追加も順位の検索もO(log n)で
+    位置が決まる。同じスコアは先に記録した方が上。今日の上位はスコアが追加されるか
+    日付が変わるまで使い回すので、毎フレーム呼んでもよい。
+    保存はScoreLog（追記専用のログとスナップショット）で行う。
+    """
+    def __init__(self, filename="ranking.json", log_filename="ranking_log.jsonl", top_count=5):
         self.filename = filename
-        self.rankings = self.load_rankings()
-    
+        self.log = ScoreLog(filename, log_filename)
+        self.top_count = top_count  # get_daily_rankings()などで返す件数
+        self.entries = []  # 全履歴（記録した順）
+        self._daily = {}  # 日付 -> (負のスコアの並び, エントリの並び)
+        self._all_time = ([], [])
+        self._daily_top = (None, [])  # (日付, 今日の上位)
+        for entry in self.load_rankings():
+            self._insert(entry)
+
     def load_rankings(self):
-        """ランキングデータを読み込む"""
-        if os.path.exists(self.filename):
-            try:
-                with open(self.filename, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return {"daily": [], "all_time": []}
-        return {"daily": [], "all_time": []}
-    
+        """記録されたスコアのリストを読み込む（スナップショットとその後のログ）"""
+        entries = self.log.load()
+        if self.log.needs_compaction():
+            self.log.compact(entries)  # 起動のたびに長いログを読まないようにまとめておく
+        return entries
+
     def save_rankings(self):
-        """ランキングデータを保存する"""
-        with open(self.filename, 'w', encoding='utf-8') as f:
-            json.dump(self.rankings, f, ensure_ascii=False, indent=2)
-    
+        """全てのスコアをスナップショットに書き、ログを空にする"""
+        self.log.compact(self.entries)
+
+    @staticmethod
+    def _insert_sorted(ranking, entry):
+        keys, entries = ranking
+        index = bisect_right(keys, -entry["score"])  # 同じスコアの後ろに入れる
+        keys.insert(index, -entry["score"])
+        entries.insert(index, entry)
+
+    def _insert(self, entry):
+        self.entries.append(entry)
+        self._insert_sorted(self._daily.setdefault(entry["date"], ([], [])), entry)
+        self._insert_sorted(self._all_time, entry)
+
     def add_score(self, score):
         """新しいスコアを追加"""
-        today = datetime.now().strftime("%Y-%m-%d")
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-        
-        # 日別ランキングに追加
-        daily_entry = {
+        now = datetime.now()
+        entry = {
             "score": score,
-            "date": today,
-            "timestamp": timestamp
+            "date": now.strftime("%Y-%m-%d"),
+            "timestamp": now.strftime("%Y-%m-%d %H:%M")
         }
-        self.rankings["daily"].append(daily_entry)
-        
-        # 全体ランキングに追加
-        all_time_entry = {
-            "score": score,
-            "date": today,
-            "timestamp": timestamp
-        }
-        self.rankings["all_time"].append(all_time_entry)
-        
-        # ソート（スコアの高い順）
-        self.rankings["daily"].sort(key=lambda x: x["score"], reverse=True)
-        self.rankings["all_time"].sort(key=lambda x: x["score"], reverse=True)
-        
-        # 上位10位まで保持
-        self.rankings["daily"] = self.rankings["daily"][:10]
-        self.rankings["all_time"] = self.rankings["all_time"][:10]
-        
-        self.save_rankings()
-    
+        self.log.append(entry)  # ファイル全体は書き直さず、1行追記する
+        self._insert(entry)
+        self._daily_top = (None, [])  # 今日の上位を作り直させる
+        if self.log.needs_compaction():
+            self.save_rankings()
+
+    def sync_if_due(self):
+        """まだディスクに書いていないスコアがあれば書き込む（メインループから毎フレーム呼ぶ）"""
+        self.log.sync_if_due()
+
+    def close(self):
+        self.log.close()
+
     def get_daily_rankings(self):
         """本日のランキングを取得"""
         today = datetime.now().strftime("%Y-%m-%d")
-        daily_scores = [entry for entry in self.rankings["daily"] if entry["date"] == today]
-        return daily_scores[:5]  # 上位5位まで
-    
+        if self._daily_top[0] != today:
+            self._daily_top = (today, self._daily.get(today, ([], []))[1][:self.top_count])
+        return self._daily_top[1]
+
     def get_all_time_rankings(self):
         """全体ランキングを取得"""
-        return self.rankings["all_time"][:5]  # 上位5位まで
-    
+        return self._all_time[1][:self.top_count]
+
     def get_player_rank(self, score):
-        """プレイヤーの順位を取得"""
+        """プレイヤーの順位を取得（同じスコアの場合は同じ順位）"""
         today = datetime.now().strftime("%Y-%m-%d")
-        daily_scores = [entry["score"] for entry in self.rankings["daily"] if entry["date"] == today]
-        
-        # 同じスコアの場合は同じ順位
-        rank = 1
-        for s in daily_scores:
-            if s > score:
-                rank += 1
-        return rank 
\ No newline at end of file
+        keys = self._daily.get(today, ([], []))[0]
+        return bisect_left(keys, -score) + 1  # 自分より高いスコアの数 + 1
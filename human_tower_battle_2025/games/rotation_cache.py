@@ -0,0 +1,76 @@
+import time
+from collections import OrderedDict
+import pygame
+
+
+class RotationCache:
+    """回転した画像を全ての動物で共有してキャッシュする
+
+    角度はstep度ごとに丸め、(元の画像, 丸めた角度) ごとに回転した画像を保持する。
+    保持している画像の合計がmax_bytesを超えたら、最も長く使われていないものから
+    破棄する（上限は動物ごとではなく全体で決める）。prewarm()はその角度の前後
+    prewarm_range段の角度を予約し、warm()でフレームの余った時間に回転しておくので、
+    タワーが揺れ始めても描画中に回転せずにすむ。元の画像は画面と同じピクセル形式
+    （convert_alpha済み）にしておくこと。返したSurfaceは共有されるので書き換えないこと。
+    """
+    def __init__(self, step=1, max_bytes=256 * 1024 * 1024, prewarm_range=1, max_requests=256):
+        self.step = step
+        self.max_bytes = max_bytes
+        self.prewarm_range = prewarm_range
+        self.max_requests = max_requests
+        self._surfaces = OrderedDict()  # (元の画像, 角度) -> 回転した画像
+        self._bytes = 0
+        self._requests = OrderedDict()  # 予約された (元の画像, 角度)。古い予約から回転する
+
+    def quantize(self, angle):
+        """角度をstep度ごとに丸める"""
+        return round(angle / self.step) * self.step
+
+    def get(self, image, angle):
+        """imageをangle度回転した画像と、実際に回転した（丸めた）角度を返す"""
+        angle = self.quantize(angle)
+        key = (image, angle % 360)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            return surface, angle
+        surface = self._store(key)
+        return surface, angle
+
+    def _store(self, key):
+        self._requests.pop(key, None)
+        surface = pygame.transform.rotate(*key)
+        self._surfaces[key] = surface
+        self._bytes += surface.get_bytesize() * surface.get_width() * surface.get_height()
+        while self._bytes > self.max_bytes and len(self._surfaces) > 1:
+            _, old = self._surfaces.popitem(last=False)
+            self._bytes -= old.get_bytesize() * old.get_width() * old.get_height()
+        return surface
+
+    def prewarm(self, image, angle):
+        """angleの前後の角度を、次のwarm()で回転するように予約する"""
+        angle = self.quantize(angle)
+        for i in range(-self.prewarm_range, self.prewarm_range + 1):
+            key = (image, (angle + i * self.step) % 360)
+            if key not in self._surfaces:
+                self._requests[key] = None
+        while len(self._requests) > self.max_requests:
+            self._requests.popitem(last=False)  # 回転する時間がないまま古くなった予約は捨てる
+
+    def warm(self, budget):
+        """予約された角度をbudget秒のあいだ回転しておく（メインループのフレームの最後に呼ぶ）"""
+        deadline = time.perf_counter() + budget
+        while self._requests and time.perf_counter() < deadline:
+            key, _ = self._requests.popitem(last=False)
+            if key not in self._surfaces:
+                self._store(key)
+
+    def clear(self):
+        """全ての画像と予約を破棄する（ゲームのやり直しやウィンドウサイズの変更時）"""
+        self._surfaces.clear()
+        self._requests.clear()
+        self._bytes = 0
+
+
+# ゲーム全体で共有するキャッシュ
+rotation_cache = RotationCache()
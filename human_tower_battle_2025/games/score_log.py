@@ -0,0 +1,150 @@
+import json
+import os
+import time
+from collections import Counter
+
+class ScoreLog:
+    """スコアを追記専用のログ（1行1件のJSON）に書き、ときどきスナップショットにまとめる
+
+    追加は1行書き足すだけ。ディスクへの書き込み（fsync）は前回からsync_interval秒
+    たっていればすぐ、そうでなければ次の追加かsync_if_due()のときにまとめて行う。
+    スナップショットは一時ファイルに書いてから置き換えるので、書き込み中に落ちても
+    前のスナップショットが残る。各スコアには通し番号（seq）を付け、スナップショットに
+    含まれた番号以下のログは読み込み時に飛ばす（まとめた直後に落ちても二重にならない）。
+    """
+    def __init__(self, snapshot_path="ranking.json", log_path="ranking_log.jsonl",
+                 sync_interval=1.0, compact_every=200):
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path
+        self.sync_interval = sync_interval
+        self.compact_every = compact_every  # ログがこの件数になったらスナップショットにまとめる
+        self._seq = 0
+        self._log_count = 0
+        self._pending = 0
+        self._last_sync = 0.0
+        self._file = None
+
+    def load(self):
+        """スナップショットとその後のログを読み込み、スコアを記録した順に返す"""
+        entries, last_seq = self._read_snapshot()
+        self._seq = last_seq
+        for entry in entries:
+            if "seq" not in entry:  # 通し番号のない以前の形式
+                self._seq += 1
+                entry["seq"] = self._seq
+            self._seq = max(self._seq, entry["seq"])
+        for entry in self._read_log(last_seq):
+            entries.append(entry)
+            self._seq = max(self._seq, entry["seq"])
+        return entries
+
+    def _read_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return [], 0
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            # 壊れたファイルは上書きしないように別名で残し、ログだけから読み込む
+            broken_path = self.snapshot_path + ".broken"
+            print(f"ランキングのスナップショットを読み込めません（{e}）。{broken_path}に移動します")
+            os.replace(self.snapshot_path, broken_path)
+            return [], 0
+        if "scores" in data:
+            return data["scores"], data.get("last_seq", 0)
+        # 上位10件だけを持っていた以前の形式。両方に入っている記録は1件として数える
+        counts = Counter()
+        for name in ("daily", "all_time"):
+            counts |= Counter((e["score"], e["date"], e["timestamp"]) for e in data.get(name, []))
+        entries = [{"score": score, "date": date, "timestamp": timestamp}
+                   for (score, date, timestamp), n in counts.items() for _ in range(n)]
+        entries.sort(key=lambda x: x["timestamp"])
+        return entries, 0
+
+    def _read_log(self, last_seq):
+        if not os.path.exists(self.log_path):
+            return []
+        with open(self.log_path, 'rb') as f:
+            data = f.read()
+        entries = []
+        valid_end = 0
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b'\n'):
+                break  # 書いている途中で落ちた最後の行
+            valid_end += len(line)
+            self._log_count += 1
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                print(f"{self.log_path}の壊れた行を飛ばします: {line[:80]!r}")
+                continue
+            if entry["seq"] > last_seq:
+                entries.append(entry)
+        if valid_end < len(data):
+            # 書きかけの行を消しておく（後ろに追記すると次の行とつながってしまうため）
+            print(f"{self.log_path}の書きかけの行を削除します")
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(valid_end)
+        return entries
+
+    def append(self, entry):
+        """スコアをログに追記する（entryには通し番号seqを付ける）"""
+        self._seq += 1
+        entry["seq"] = self._seq
+        if self._file is None:
+            self._file = open(self.log_path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()  # ここまででゲームが落ちても消えない（OSの停止・電源断にはfsyncが必要）
+        self._log_count += 1
+        self._pending += 1
+        self.sync_if_due()
+
+    def sync_if_due(self):
+        """前回のfsyncからsync_interval秒たっていれば、まだのスコアをディスクに書き込む"""
+        if self._pending and time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        if self._file is not None and self._pending:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def needs_compaction(self):
+        return self._log_count >= self.compact_every
+
+    def compact(self, entries):
+        """全てのスコアをスナップショットに書き、ログを空にする"""
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"last_seq": self._seq, "scores": entries}, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        self._sync_dir()
+        # スナップショットに入ったのでログは空にしてよい（ここで落ちてもseqで二重にならない）
+        if self._file is None:
+            self._file = open(self.log_path, 'a', encoding='utf-8')
+        self._file.truncate(0)
+        self._pending = 1
+        self.sync()
+        self._log_count = 0
+
+    def _sync_dir(self):
+        """ファイルの置き換えをディスクに書き込む（ディレクトリを開けないWindowsでは何もしない）"""
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(self.snapshot_path)), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
@@ -0,0 +1,69 @@
+from collections import OrderedDict
+import pygame
+
+
+class TextCache:
+    """フォントの読み込みと文字列の描画結果をキャッシュする
+
+    フォントは候補のパスを先頭から試し、最初に読み込めたものを使う
+    （どれも読み込めなければpygameの標準フォント）。描画した文字列は
+    (文字列, サイズ, 色) ごとに保持し、max_surfaces個を超えたら
+    最も長く使われていないものから破棄する。返したSurfaceは共有されるので
+    set_alphaなどで書き換えないこと。
+    """
+    def __init__(self, font_paths=(), max_surfaces=256):
+        self.font_paths = list(font_paths)
+        self.max_surfaces = max_surfaces
+        self._font_path = None
+        self._font_resolved = False
+        self._fonts = {}
+        self._surfaces = OrderedDict()
+
+    def _load_font(self, size):
+        if not self._font_resolved:
+            # 候補のパスを探すのは最初の1回だけ
+            for path in self.font_paths:
+                try:
+                    font = pygame.font.Font(path, size)
+                except (OSError, pygame.error):
+                    continue
+                self._font_path = path
+                self._font_resolved = True
+                return font
+            self._font_resolved = True
+        return pygame.font.Font(self._font_path, size)
+
+    def font(self, size):
+        """指定サイズのフォントを返す（各サイズ1回だけ読み込む）"""
+        font = self._fonts.get(size)
+        if font is None:
+            font = self._load_font(size)
+            self._fonts[size] = font
+        return font
+
+    def render(self, text, size, color, antialias=True):
+        """文字列を描画したSurfaceを返す"""
+        key = (text, size, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            return surface
+        surface = self.font(size).render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_surfaces:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """ウィンドウサイズの変更時に描画済みの文字列を破棄する"""
+        self._surfaces.clear()
+
+
+# 日本語フォントの候補（macOS用 → 代替フォント → 標準フォント）
+JAPANESE_FONT_PATHS = [
+    "/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc",
+    "/System/Library/Fonts/Arial Unicode MS.ttf",
+]
+
+# ゲーム全体で共有するキャッシュ
+text_cache = TextCache(JAPANESE_FONT_PATHS)